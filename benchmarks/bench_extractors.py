@@ -0,0 +1,151 @@
+"""Benchmark each cryptory extractor against offline fixtures
+
+Reports the time spent downloading, parsing, building dataframes and
+merging/filling (plus peak memory) for a range of date spans, e.g.
+
+    python benchmarks/bench_extractors.py --years 1 5 10 --repeat 5
+"""
+import os
+import sys
+import time
+import argparse
+import datetime
+import functools
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cryptory.cryptory as cryptory_module
+from cryptory import Cryptory
+from fixtures import FixtureSession
+
+EXTRACTORS = [
+    ('redditmetrics', 'extract_reddit_metrics', {'subreddit': 'bitcoin', 'metric': 'total-subscribers'}),
+    ('bitinfocharts', 'extract_bitinfocharts', {'coin': 'btc'}),
+    ('poloniex', 'extract_poloniex', {'coin1': 'btc', 'coin2': 'eth'}),
+    ('indexmundi', 'get_exchange_rates', {'from_currency': 'USD', 'to_currency': 'EUR'}),
+    ('yahoo', 'get_stock_prices', {'market': '%5EDJI'}),
+    ('eia', 'get_oil_prices', {}),
+    ('kitco', 'get_metal_prices', {}),
+]
+
+STAGES = ['download', 'parse', 'build', 'merge']
+
+
+class _Timings(object):
+
+    def __init__(self):
+        self.totals = dict((stage, 0.0) for stage in STAGES)
+        self._active = None
+
+    def timed(self, stage, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # nested calls are attributed to the outermost stage
+            if self._active is not None:
+                return func(*args, **kwargs)
+            self._active = stage
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.totals[stage] += time.perf_counter() - start
+                self._active = None
+        return wrapper
+
+
+class _TimedModule(object):
+    # stands in for a module, timing some of its functions
+
+    def __init__(self, module, names, timings, stage):
+        self._module = module
+        self._names = names
+        self._timings = timings
+        self._stage = stage
+
+    def __getattr__(self, name):
+        attr = getattr(self._module, name)
+        if name in self._names:
+            return self._timings.timed(self._stage, attr)
+        return attr
+
+
+def _instrument(cr, timings):
+    session = cr._session
+    session.get = timings.timed('download', session.get)
+    for name in ['_reindex', '_fill_order']:
+        setattr(cr, name, timings.timed('merge', getattr(cr, name)))
+    # parsing happens through module level names in cryptory.cryptory
+    patches = {
+        'json': _TimedModule(cryptory_module.json, ['loads'], timings, 'parse'),
+        'pd': _TimedModule(cryptory_module.pd, ['read_html'], timings, 'parse'),
+    }
+    for name in ['_parse_reddit', '_parse_dygraph', '_parse_poloniex', '_parse_exchange_rates',
+                 '_parse_yahoo', '_parse_eia', '_parse_metal_prices']:
+        patches[name] = timings.timed('parse', getattr(cryptory_module, name))
+    originals = dict((name, getattr(cryptory_module, name)) for name in patches)
+    for name, patch in patches.items():
+        setattr(cryptory_module, name, patch)
+    return originals
+
+
+def run(source, method, kwargs, from_date, to_date, repeat):
+    session = FixtureSession(from_date, to_date)
+    cr = Cryptory(from_date=from_date, to_date=to_date)
+    cr._session = session
+    # warm up (renders the fixtures and imports anything loaded lazily)
+    getattr(cr, method)(**kwargs)
+    timings = _Timings()
+    originals = _instrument(cr, timings)
+    try:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            output = getattr(cr, method)(**kwargs)
+        total = time.perf_counter() - start
+    finally:
+        for name, original in originals.items():
+            setattr(cryptory_module, name, original)
+    result = dict((stage, seconds / repeat) for stage, seconds in timings.totals.items())
+    # memory tracing slows everything down, so it gets a separate run
+    tracemalloc.start()
+    try:
+        getattr(cr, method)(**kwargs)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    # anything not captured above is dataframe building/reshaping
+    result['build'] = total / repeat - sum(result[stage] for stage in ['download', 'parse', 'merge'])
+    result['total'] = total / repeat
+    result['peak_mb'] = peak / 1024.0 / 1024.0
+    result['rows'] = len(output)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument('--years', type=int, nargs='+', default=[1, 5, 10],
+                        help='date spans (in years) to benchmark')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement')
+    parser.add_argument('--sources', nargs='+', default=None,
+                        help='only benchmark these sources (e.g. poloniex eia)')
+    args = parser.parse_args(argv)
+    # a fixed end date keeps runs comparable
+    to_date = datetime.date(2019, 12, 31)
+    print("{:<14}{:>6}{:>8}{:>10}{:>10}{:>10}{:>10}{:>10}{:>10}".format(
+        'source', 'years', 'rows', 'download', 'parse', 'build', 'merge', 'total', 'peak MB'))
+    for source, method, kwargs in EXTRACTORS:
+        if args.sources is not None and source not in args.sources:
+            continue
+        for years in args.years:
+            from_date = to_date.replace(year=to_date.year - years) + datetime.timedelta(days=1)
+            result = run(source, method, kwargs, from_date.strftime("%Y-%m-%d"),
+                         to_date.strftime("%Y-%m-%d"), args.repeat)
+            print("{:<14}{:>6}{:>8}{:>10.2f}{:>10.2f}{:>10.2f}{:>10.2f}{:>10.2f}{:>10.1f}".format(
+                source, years, result['rows'],
+                *[result[stage] * 1000 for stage in STAGES + ['total']] + [result['peak_mb']]))
+    print("(times in milliseconds per call)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark refreshing many series with and without a ParsePool
+
+Extracts intraday poloniex prices for a number of coin pairs (with extract_batch)
+from offline fixtures, parsing either in threads or in a pool of processes, e.g.
+
+    python benchmarks/bench_parse_pool.py --pairs 16 --days 180 --processes 2 4 8
+"""
+import os
+import sys
+import time
+import argparse
+import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cryptory import Cryptory, ParsePool
+from fixtures import FixtureSession
+
+
+def run(session, specs, from_date, to_date, frequency, parse_pool, repeat):
+    timings = []
+    for _ in range(repeat):
+        cr = Cryptory(from_date=from_date, to_date=to_date, frequency=frequency,
+                      parse_pool=parse_pool)
+        cr._session = session
+        start = time.perf_counter()
+        output = cr.extract_batch(specs, max_workers=len(specs), max_per_source=len(specs))
+        timings.append(time.perf_counter() - start)
+    return min(timings), len(output)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument('--pairs', type=int, default=16, help='number of coin pairs')
+    parser.add_argument('--days', type=int, default=180, help='days of prices for each pair')
+    parser.add_argument('--frequency', default='5min', help='interval between prices')
+    parser.add_argument('--processes', type=int, nargs='+', default=[2, 4],
+                        help='pool sizes to benchmark')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement')
+    args = parser.parse_args(argv)
+    # a fixed end date keeps runs comparable
+    to_date = datetime.date(2019, 12, 31)
+    from_date = (to_date - datetime.timedelta(days=args.days - 1)).strftime("%Y-%m-%d")
+    to_date = to_date.strftime("%Y-%m-%d")
+    specs = [('extract_poloniex', {'coin1': 'btc', 'coin2': 'coin{}'.format(i)})
+             for i in range(args.pairs)]
+    session = FixtureSession(from_date, to_date)
+    # warm up (renders the fixtures, which are then shared by every run)
+    run(session, specs, from_date, to_date, args.frequency, None, 1)
+    print("{:<14}{:>8}{:>12}{:>14}".format('parsing', 'rows', 'seconds', 'series/sec'))
+    seconds, rows = run(session, specs, from_date, to_date, args.frequency, None, args.repeat)
+    print("{:<14}{:>8}{:>12.2f}{:>14.1f}".format('threads', rows, seconds, args.pairs / seconds))
+    for processes in args.processes:
+        with ParsePool(processes) as pool:
+            # the first parse starts the processes
+            run(session, specs[:1], from_date, to_date, args.frequency, pool, 1)
+            seconds, rows = run(session, specs, from_date, to_date, args.frequency, pool, args.repeat)
+        print("{:<14}{:>8}{:>12.2f}{:>14.1f}".format(
+            '{} processes'.format(processes), rows, seconds, args.pairs / seconds))
+
+
+if __name__ == '__main__':
+    main()
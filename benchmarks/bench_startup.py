@@ -0,0 +1,58 @@
+"""Benchmark the time taken to import cryptory (and create a Cryptory) in a new process
+
+Each statement is run in a fresh interpreter, reporting the median time and the
+heavy dependencies it loaded, e.g.
+
+    python benchmarks/bench_startup.py --repeat 10
+
+Pass --path to time another copy of cryptory (e.g. an older release, for comparison)
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+STATEMENTS = [
+    'import cryptory',
+    'from cryptory import Cryptory',
+    'from cryptory import Cryptory; Cryptory("2017-01-01")',
+    'from cryptory import AsyncCryptory',
+]
+
+DEPENDENCIES = ['numpy', 'pandas', 'requests', 'pytrends', 'aiohttp']
+
+_SCRIPT = """
+import sys, time, json
+sys.path.insert(0, {path!r})
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+print(json.dumps([seconds, [name for name in {dependencies!r} if name in sys.modules]]))
+"""
+
+
+def run(statement, path, repeat):
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, '-c', _SCRIPT.format(
+            path=path, statement=statement, dependencies=DEPENDENCIES)])
+        seconds, loaded = json.loads(output.decode("utf8").strip().splitlines()[-1])
+        timings.append(seconds)
+    return sorted(timings)[len(timings) // 2], loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument('--repeat', type=int, default=5, help='runs per statement')
+    parser.add_argument('--path', default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        help='directory containing the cryptory package (default is this checkout)')
+    args = parser.parse_args(argv)
+    print("{:<58}{:>10}  {}".format('statement', 'ms', 'loaded'))
+    for statement in STATEMENTS:
+        seconds, loaded = run(statement, args.path, args.repeat)
+        print("{:<58}{:>10.1f}  {}".format(statement, seconds * 1000, ", ".join(loaded)))
+
+
+if __name__ == '__main__':
+    main()
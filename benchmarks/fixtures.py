@@ -0,0 +1,163 @@
+"""Offline stand-ins for the websites scraped by cryptory
+
+Each page is generated in the same format as the live site (for a given range
+of dates), so that the parsing, dataframe building and merging stages can be
+measured without any network access.
+"""
+import re
+import json
+import time
+import datetime
+
+import numpy as np
+
+# all fixtures are generated from the same seed, so benchmark runs are comparable
+_SEED = 2017
+
+
+def _days(from_date, to_date):
+    start = datetime.datetime.strptime(from_date, "%Y-%m-%d").date()
+    end = datetime.datetime.strptime(to_date, "%Y-%m-%d").date()
+    return [start + datetime.timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def _random_walk(n_values, start=100.0):
+    steps = np.random.RandomState(_SEED).normal(0, 0.02, n_values)
+    return start * np.exp(np.cumsum(steps))
+
+
+def redditmetrics_page(from_date, to_date):
+    days = _days(from_date, to_date)
+    totals = np.cumsum(np.random.RandomState(_SEED).randint(0, 500, len(days)))
+    def segment(values):
+        return "[" + ",".join("{{y: '{}', a: {}}}".format(day.strftime("%Y-%m-%d"), value)
+                              for day, value in zip(days, values)) + "]"
+    return ("<html><script>Morris.Line({{element: 'subscriber-growth', data: {}}});"
+            "Morris.Line({{element: 'total-subscribers', data: {}}});"
+            "var rankData = {};</script></html>").format(
+                segment(np.diff(np.concatenate([[0], totals]))), segment(totals),
+                segment(np.arange(len(days), 0, -1)))
+
+
+def bitinfocharts_page(from_date, to_date, n_series=1):
+    days = _days(from_date, to_date)
+    values = [_random_walk(len(days), 1000.0 * (i + 1)) for i in range(n_series)]
+    rows = ",".join("[new Date(\"{}\"),{}]".format(
+        day.strftime("%Y-%m-%d"), ",".join("{:.2f}".format(series[i]) for series in values))
+                    for i, day in enumerate(days))
+    return ('<html><script>var dy = new Dygraph(document.getElementById("container"), '
+            '[{}], {{labels: ["Date"]}});</script></html>').format(rows)
+
+
+def poloniex_page(from_date, to_date, start=None, end=None, period=86400):
+    # candles from start to end (unix seconds), or one per day
+    if start is None:
+        times = [int(time.mktime(day.timetuple())) for day in _days(from_date, to_date)]
+    else:
+        times = list(range(start - start % period, end + 1, period))
+    prices = _random_walk(len(times), 0.05)
+    return json.dumps([{"date": stamp, "high": price * 1.01,
+                        "low": price * 0.99, "open": price, "close": price,
+                        "volume": 1000.0, "quoteVolume": 1000.0 / price,
+                        "weightedAverage": price}
+                       for stamp, price in zip(times, prices)])
+
+
+def indexmundi_page(from_date, to_date):
+    days = _days(from_date, to_date)
+    rates = _random_walk(len(days), 0.9)
+    sets = "".join("<set label='{}' value='{:.4f}' showLabel='{}'/>".format(
+        day.strftime("%m/%d/%Y"), rate, int(day.day == 1)) for day, rate in zip(days, rates))
+    return "<html><chart xAxisName='Date' yAxisName='Rate'>{}</chart></html>".format(sets)
+
+
+def yahoo_page(from_date, to_date):
+    days = [day for day in _days(from_date, to_date) if day.weekday() < 5]
+    prices = _random_walk(len(days), 20000.0)
+    rows = [{"date": int(time.mktime(day.timetuple())) + 14 * 3600, "open": price,
+             "high": price * 1.01, "low": price * 0.99, "close": price, "volume": 300000000,
+             "adjclose": price} for day, price in zip(days, prices)]
+    return ('<html><script>root.App.main = {"HistoricalPriceStore":{"prices":'
+            + json.dumps(rows) + ',"isPending":false}};</script></html>')
+
+
+def eia_page(from_date, to_date):
+    days = _days(from_date, to_date)
+    # one row per week, starting on a monday
+    mondays = [day for day in days if day.weekday() == 0]
+    prices = _random_walk(len(mondays) * 5, 50.0)
+    rows = []
+    for i, monday in enumerate(mondays):
+        friday = monday + datetime.timedelta(days=4)
+        rows.append('<tr><td class="B6">&nbsp;&nbsp;{} to {}</td>{}</tr>'.format(
+            monday.strftime("%Y %b-%d"), friday.strftime("%b-%d"),
+            "".join('<td class="B3">{:.2f}</td>'.format(price) for price in prices[i*5:(i+1)*5])))
+    return "<html><body><table>{}</table></body></html>".format("".join(rows))
+
+
+def kitco_page(year):
+    days = [day for day in _days("{}-01-01".format(year), "{}-12-31".format(year))
+            if day.weekday() < 5]
+    prices = _random_walk(len(days), 1200.0)
+    rows = "".join("<tr><td>{}</td>{}</tr>".format(
+        day.strftime("%Y-%m-%d"),
+        "".join("<td>{:.2f}</td>".format(price * scale)
+                for scale in [1.0, 1.001, 0.015, 0.8, 0.801, 0.7, 0.701]))
+                   for day, price in zip(days, prices))
+    return "<html><body><table><tr><td>menu</td></tr></table><table>{}</table></body></html>".format(rows)
+
+
+class FixtureResponse(object):
+
+    def __init__(self, content):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+
+class FixtureSession(object):
+    """Replaces the requests session of a Cryptory instance, serving generated pages
+
+    Parameters
+    ----------
+    from_date : the first date (as string) covered by the pages
+    to_date : the last date (as string) covered by the pages
+    """
+
+    def __init__(self, from_date, to_date):
+        self.from_date = from_date
+        self.to_date = to_date
+        self.requests = 0
+        self._pages = {}
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests += 1
+        if url not in self._pages:
+            self._pages[url] = self._render(url).encode("utf8")
+        return FixtureResponse(self._pages[url])
+
+    def _render(self, url):
+        if "redditmetrics.com" in url:
+            return redditmetrics_page(self.from_date, self.to_date)
+        if "bitinfocharts.com" in url:
+            coins = re.search(r"comparison/[a-z_]+-([a-z-]+)\.html", url).group(1)
+            return bitinfocharts_page(self.from_date, self.to_date, len(coins.split("-")))
+        if "poloniex.com" in url:
+            period = int(re.search(r"period=(\d+)", url).group(1))
+            if period == 86400:
+                return poloniex_page(self.from_date, self.to_date)
+            start, end = [int(re.search(name + r"=(\d+)", url).group(1)) for name in ["start", "end"]]
+            return poloniex_page(self.from_date, self.to_date, start, end, period)
+        if "indexmundi.com" in url:
+            return indexmundi_page(self.from_date, self.to_date)
+        if "finance.yahoo.com" in url:
+            return yahoo_page(self.from_date, self.to_date)
+        if "eia.gov" in url:
+            return eia_page(self.from_date, self.to_date)
+        if "kitco.com" in url:
+            match = re.search(r"londonfix(\d{2})\.html", url)
+            if match is None:
+                return kitco_page(datetime.date.today().year)
+            return kitco_page(2000 + int(match.group(1)))
+        raise ValueError("No fixture for {}".format(url))
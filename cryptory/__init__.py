@@ -1,3 +1,61 @@
-from .cryptory import *
+import sys
+import importlib
 
 __version__ = '0.1.1'
+
+# the module defining each name, which is only imported when the name is first used
+# (so that e.g. `import cryptory` doesn't load pandas, and aiohttp is only loaded
+# for AsyncCryptory)
+_EXPORTS = {
+    'Cryptory': 'cryptory',
+    'ResponseCache': 'cache',
+    'SeriesStore': 'store',
+    'Metrics': 'metrics',
+    'Panel': 'panel',
+    'Indicators': 'indicators',
+    'RetryPolicy': 'retry',
+    'CircuitOpenError': 'retry',
+    'LazyFrame': 'lazy',
+    'resample_ohlcv': 'bars',
+    'ParsePool': 'workers',
+    'AsyncCryptory': 'aio',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module('.' + _EXPORTS[name], __name__), name)
+    elif name in _EXPORTS.values() or name == 'flight':
+        return importlib.import_module('.' + name, __name__)
+    elif not name.startswith('_') and hasattr(importlib.import_module('.cryptory', __name__), name):
+        # anything else that `from .cryptory import *` used to provide
+        value = getattr(sys.modules[__name__ + '.cryptory'], name)
+    else:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+# python 2 (and before 3.7) doesn't call a module's __getattr__, so everything is imported now
+if sys.version_info < (3, 7):
+    from .cryptory import *
+    from .cache import ResponseCache
+    from .store import SeriesStore
+    from .metrics import Metrics
+    from .panel import Panel
+    from .indicators import Indicators
+    from .retry import RetryPolicy, CircuitOpenError
+    from .lazy import LazyFrame
+    from .bars import resample_ohlcv
+    from .workers import ParsePool
+    try:
+        from .aio import AsyncCryptory
+    # python 2
+    except SyntaxError:
+        __all__.remove('AsyncCryptory')
@@ -0,0 +1,99 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from .cryptory import Cryptory
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# the public methods of Cryptory, each available as a coroutine on AsyncCryptory
+_METHODS = ['extract_reddit_metrics', 'extract_coinmarketcap', 'extract_bitinfocharts',
+            'extract_poloniex', 'get_exchange_rates', 'get_stock_prices', 'get_oil_prices',
+            'get_metal_prices', 'get_google_trends', 'merge_frames', 'extract_batch',
+            'extract_panel', 'get_indicators']
+
+
+class _LoopCryptory(Cryptory):
+    # runs in executor threads, but hands every download to the event loop
+
+    def _download(self, url, headers, timeout):
+        if aiohttp is None:
+            return Cryptory._download(self, url, headers, timeout)
+        return asyncio.run_coroutine_threadsafe(
+            self._owner._download(url, headers, timeout), self._owner._loop).result()
+
+
+class AsyncCryptory():
+
+    def __init__(self, *args, **kwargs):
+        """Initialise cryptory class for use within asyncio applications
+
+        Every cryptory method (extract_poloniex, get_stock_prices etc.) is a coroutine,
+        so many requests can be awaited together (e.g. with asyncio.gather).
+        Downloads are made by a shared aiohttp session on the event loop (or, if aiohttp
+        isn't installed, by the requests session in a separate thread) and all parsing
+        runs in a thread pool, so the event loop is never blocked.
+
+        Parameters
+        ----------
+        max_workers : the number of threads parsing results at the same time
+            (default is 8)
+        all other arguments are passed to Cryptory (see help(Cryptory))
+        """
+        max_workers = kwargs.pop('max_workers', 8)
+        self.cryptory = _LoopCryptory(*args, **kwargs)
+        self.cryptory._owner = self
+        self._pool_size = kwargs.get('pool_size', 10)
+        self._executor = ThreadPoolExecutor(max_workers)
+        self._loop = None
+        self._session = None
+
+    async def close(self):
+        """Close the shared session and the thread pool"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        self._executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def _run(self, method, *args, **kwargs):
+        self._loop = asyncio.get_event_loop()
+        return await self._loop.run_in_executor(
+            self._executor, functools.partial(method, *args, **kwargs))
+
+    async def _download(self, url, headers, timeout):
+        if self._session is None:
+            # the session belongs to the running event loop, so it's created on first use
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=self._pool_size))
+        # connection errors and timeouts are raised as with requests, so they're retried
+        try:
+            async with self._session.get(url, headers=headers,
+                                         timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                response.raise_for_status()
+                return await response.read()
+        except aiohttp.ClientConnectionError as error:
+            raise requests.ConnectionError(str(error))
+        except asyncio.TimeoutError:
+            raise requests.Timeout("Timed out after {} seconds: {}".format(timeout, url))
+
+
+def _coroutine(name):
+    async def method(self, *args, **kwargs):
+        return await self._run(getattr(self.cryptory, name), *args, **kwargs)
+    method.__name__ = name
+    method.__doc__ = getattr(Cryptory, name).__doc__
+    return method
+
+for _name in _METHODS:
+    setattr(AsyncCryptory, _name, _coroutine(_name))
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+
+def resample_ohlcv(data, frequency):
+    """Combine price bars (e.g. 5 minute poloniex candles) into coarser bars
+
+    Parameters
+    ----------
+    data : pandas Dataframe with a date column (or index) and any of the columns
+        open, high, low, close, volume, quoteVolume and weightedAverage
+    frequency : the length of the new bars, as a pandas frequency (e.g. 'h', '4h', 'D')
+
+    Returns
+    -------
+    pandas Dataframe, with the same columns and date order as data
+
+    Notes
+    -----
+    Each bar starts at the first price of its period and ends at the last, with
+    volumes summed. Any other columns (e.g. coin1) take their last value
+    """
+    date_col = 'date' in data.columns
+    frame = data.reset_index() if not date_col else data
+    descending = len(frame) > 1 and frame['date'].iloc[0] > frame['date'].iloc[-1]
+    frame = frame.sort_values(by='date', kind='mergesort')
+    dates = pd.DatetimeIndex(frame['date'])
+    if len(frame) == 0:
+        return data
+    # every bar is a contiguous run of rows, so each column is reduced in one pass
+    buckets = dates.floor(frequency)
+    starts = np.concatenate([[0], np.flatnonzero(buckets[1:] != buckets[:-1]) + 1])
+    ends = np.concatenate([starts[1:], [len(frame)]]) - 1
+    output = {'date': buckets[starts]}
+    for col in frame.columns:
+        if col == 'date':
+            continue
+        values = frame[col].values
+        if col == 'open':
+            output[col] = values[starts]
+        elif col == 'high':
+            output[col] = np.maximum.reduceat(values, starts)
+        elif col == 'low':
+            output[col] = np.minimum.reduceat(values, starts)
+        elif col in ['volume', 'quoteVolume']:
+            output[col] = np.add.reduceat(values, starts)
+        elif col != 'weightedAverage':
+            output[col] = values[ends]
+    if 'weightedAverage' in frame.columns:
+        if 'volume' in frame.columns and 'quoteVolume' in frame.columns:
+            # volume (in coin1) over quoteVolume (in coin2) is the average price
+            with np.errstate(invalid='ignore', divide='ignore'):
+                output['weightedAverage'] = np.where(
+                    output['quoteVolume'] > 0, output['volume'] / output['quoteVolume'],
+                    frame['weightedAverage'].values[ends])
+        else:
+            output['weightedAverage'] = frame['weightedAverage'].values[ends]
+    output = pd.DataFrame(output, columns=list(frame.columns))
+    if descending:
+        output = output.iloc[::-1].reset_index(drop=True)
+    if not date_col:
+        output = output.set_index('date')
+    return output
@@ -0,0 +1,154 @@
+import os
+import time
+import hashlib
+import threading
+
+
+class ResponseCache():
+
+    def __init__(self, cache_dir, ttl=86400, max_size=500*1024*1024):
+        """Initialise an on-disk cache for raw web responses
+
+        Parameters
+        ----------
+        cache_dir : the directory (as string) where cached responses are stored
+            (it will be created if it doesn't already exist)
+        ttl : the number of seconds a cached response remains valid
+            either a single number applied to every source or a dict keyed by
+            source name (e.g. {'bitinfocharts': 3600, 'default': 86400})
+            None means responses never expire (default is 86400 i.e. one day)
+        max_size : the maximum total size (in bytes) of the cache directory
+            once exceeded, the least recently used responses are removed
+            (default is 500MB)
+        """
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir)
+        self._size = sum(size for _, _, size in self._entries())
+
+    def get(self, source, key, immutable=False):
+        """Retrieve a cached response
+
+        Parameters
+        ----------
+        source : the name of the data source (e.g. 'poloniex')
+        key : the url (plus any other identifying parameters) of the request
+        immutable : whether the response can never change (e.g. a date range
+            entirely in the past), in which case the ttl is ignored
+
+        Returns
+        -------
+        bytes (or None if the response isn't cached or has expired)
+        """
+        path = self._path(source, key)
+        with self._lock:
+            try:
+                created = os.path.getmtime(path)
+            except OSError:
+                self.misses += 1
+                return None
+            ttl = self._source_ttl(source)
+            if not immutable and ttl is not None and time.time() - created > ttl:
+                self._remove(path)
+                self.misses += 1
+                return None
+            with open(path, 'rb') as f:
+                payload = f.read()
+            # access time drives the LRU eviction, modification time the ttl
+            os.utime(path, (time.time(), created))
+            self.hits += 1
+        return payload
+
+    def set(self, source, key, payload):
+        """Store a response in the cache
+
+        Parameters
+        ----------
+        source : the name of the data source (e.g. 'poloniex')
+        key : the url (plus any other identifying parameters) of the request
+        payload : the raw response (as bytes)
+        """
+        path = self._path(source, key)
+        with self._lock:
+            if os.path.exists(path):
+                self._remove(path)
+            if self.max_size is not None and len(payload) > self.max_size:
+                # it would only evict everything else (and then itself)
+                return
+            directory = os.path.dirname(path)
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            # write then rename, so concurrent readers never see partial files
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.rename(tmp_path, path)
+            self._size += len(payload)
+            if self.max_size is not None and self._size > self.max_size:
+                self._evict()
+
+    def stats(self):
+        """Summarise cache usage
+
+        Returns
+        -------
+        dict with the number of hits, misses, evictions and the current size (in bytes)
+        """
+        return {'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'size': self._size}
+
+    def clear(self, source=None):
+        """Remove cached responses
+
+        Parameters
+        ----------
+        source : only remove responses from this source
+            (default is None i.e. the whole cache is cleared)
+        """
+        with self._lock:
+            for path, _, _ in self._entries():
+                if source is None or os.path.basename(os.path.dirname(path)) == source:
+                    self._remove(path)
+
+    def _source_ttl(self, source):
+        if isinstance(self.ttl, dict):
+            return self.ttl.get(source, self.ttl.get('default', 86400))
+        return self.ttl
+
+    def _path(self, source, key):
+        digest = hashlib.sha1(key.encode('utf8')).hexdigest()
+        return os.path.join(self.cache_dir, source, digest)
+
+    def _entries(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_atime, stat.st_size
+
+    def _remove(self, path):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        self._size -= size
+
+    def _evict(self):
+        # least recently accessed first
+        for path, _, _ in sorted(self._entries(), key=lambda entry: entry[1]):
+            if self._size <= self.max_size:
+                break
+            self._remove(path)
+            self.evictions += 1
@@ -0,0 +1,270 @@
+import os
+import json
+import time
+import argparse
+import datetime
+from multiprocessing.pool import ThreadPool
+
+from . import __version__
+from .cryptory import Cryptory, _spec_label, _shift_date
+from .store import SeriesStore, _replace
+
+# the keys of each job in a manifest
+_JOB_KEYS = ['method', 'symbols', 'metrics', 'arguments', 'from_date', 'to_date']
+
+_PHASES = ['download', 'parse', 'store']
+
+
+def main(argv=None):
+    """Refresh every series listed in a manifest into a local store (the cryptory command)
+
+    Parameters
+    ----------
+    argv : list of command line arguments (default is None i.e. sys.argv[1:])
+
+    Returns
+    -------
+    the exit status: 0 if every series was refreshed, 1 if any failed
+    (and 130 if the run was interrupted)
+
+    Notes
+    -----
+    The manifest is a json file, e.g.
+        {"from_date": "2017-01-01", "store": "~/.cryptory/store",
+         "jobs": [{"method": "extract_bitinfocharts", "symbols": ["btc", "eth"],
+                   "metrics": ["price", "transactions"]},
+                  {"method": "extract_poloniex", "symbols": [["btc", "eth"], ["btc", "ltc"]],
+                   "from_date": "2018-01-01"},
+                  {"method": "get_stock_prices", "arguments": {"market": "%5EDJI"}},
+                  {"method": "get_oil_prices"}]}
+    Each job runs a cryptory method once for every symbol (the first argument of
+    the method, or the first few for a list) and metric, with any other arguments.
+    from_date and to_date can be set for the whole manifest or for each job (to_date
+    defaults to the day the run started, which a rerun of an interrupted run keeps). The manifest can also set to_date, checkpoint,
+    max_workers, max_per_source and options (further arguments of Cryptory, e.g.
+    {"cache": "~/.cryptory/cache", "timeout": 30}).
+
+    Each result is written to the store under the method and its argument values
+    (e.g. read with SeriesStore(store).read('extract_poloniex', 'btc_eth')), while
+    the downloaded series are kept in the same store, so only new dates are
+    downloaded next time. Completed series are recorded in a checkpoint file as
+    they finish, so an interrupted run picks up where it stopped when it's rerun
+    (the checkpoint is removed once every series has been refreshed)
+    """
+    parser = argparse.ArgumentParser(
+        prog='cryptory', description="Refresh every series listed in a manifest into a local store")
+    parser.add_argument('manifest', help='json file listing the series to refresh')
+    parser.add_argument('--store', help='directory of the store (default is the store in the manifest)')
+    parser.add_argument('--checkpoint',
+                        help='file recording the completed series (default is the manifest with .progress added)')
+    parser.add_argument('--restart', action='store_true',
+                        help='ignore the checkpoint and refresh every series')
+    parser.add_argument('--max-workers', type=int,
+                        help='number of series refreshed at the same time (default is 8)')
+    parser.add_argument('--max-per-source', type=int,
+                        help='number of requests sent to the same website at the same time (default is 4)')
+    parser.add_argument('--quiet', action='store_true', help="only report the summary")
+    parser.add_argument('--version', action='version', version='%(prog)s ' + __version__)
+    args = parser.parse_args(argv)
+    try:
+        manifest = _load_manifest(args.manifest)
+        checkpoint = _Checkpoint(args.checkpoint or manifest.get('checkpoint') or args.manifest + '.progress',
+                                 args.restart)
+        specs = _expand_jobs(manifest, checkpoint.today)
+    except (IOError, ValueError) as error:
+        parser.error(str(error))
+    store = args.store or manifest.get('store')
+    if store is None:
+        parser.error("A store is needed (either --store or a store in the manifest)")
+    options = dict(manifest.get('options', {}))
+    options.update(store=SeriesStore(store), metrics=True)
+    cryptory = Cryptory(manifest['from_date'], manifest.get('to_date') or checkpoint.today, **options)
+    return _refresh(cryptory, specs, checkpoint,
+                    args.max_workers or manifest.get('max_workers', 8),
+                    args.max_per_source or manifest.get('max_per_source', 4), args.quiet)
+
+
+def _load_manifest(path):
+    with open(path) as f:
+        try:
+            manifest = json.load(f)
+        except ValueError as error:
+            raise ValueError("{} isn't valid json: {}".format(path, error))
+    if not isinstance(manifest, dict) or not isinstance(manifest.get('jobs'), list):
+        raise ValueError("The manifest must be a json object with a list of jobs")
+    if 'from_date' not in manifest:
+        raise ValueError("The manifest must have a from_date")
+    return manifest
+
+
+def _expand_jobs(manifest, today):
+    # one (method, arguments, (from_date, to_date)) spec for each symbol and metric of each job
+    # (today is the to_date of jobs without one)
+    from_date = manifest['from_date']
+    to_date = manifest.get('to_date') or today
+    specs = []
+    for job in manifest['jobs']:
+        method = job.get('method') if isinstance(job, dict) else None
+        if method is None:
+            raise ValueError("Every job must have a method (e.g. 'extract_poloniex')")
+        unknown = [key for key in job if key not in _JOB_KEYS]
+        if len(unknown) > 0:
+            raise ValueError("Unknown keys in the {} job: {}".format(method, ", ".join(unknown)))
+        func = getattr(Cryptory, method, None)
+        if func is None or not method.startswith(('extract_', 'get_')) or method in [
+                'extract_batch', 'extract_panel', 'get_indicators']:
+            raise ValueError("Not a valid cryptory method: {}".format(method))
+        code = getattr(func, '__wrapped__', func).__code__
+        params = code.co_varnames[1:code.co_argcount]
+        window = (job.get('from_date', from_date), job.get('to_date') or to_date)
+        for date in window:
+            datetime.datetime.strptime(date, "%Y-%m-%d")
+        if window[0] > window[1]:
+            raise ValueError("The {} job ends before it starts".format(method))
+        for symbol in job.get('symbols', [None]):
+            for metric in job.get('metrics', [None]):
+                kwargs = {}
+                if symbol is not None:
+                    # e.g. ["btc", "eth"] for coin1 and coin2
+                    symbol = symbol if isinstance(symbol, list) else [symbol]
+                    if len(symbol) > len(params):
+                        raise ValueError("Too many values in the {} symbol {}".format(method, symbol))
+                    kwargs.update(zip(params, symbol))
+                if metric is not None:
+                    if 'metric' not in params:
+                        raise ValueError("{} doesn't have metrics".format(method))
+                    kwargs['metric'] = metric
+                kwargs.update(job.get('arguments', {}))
+                specs.append((method, kwargs, window))
+    return specs
+
+
+def _refresh(cryptory, specs, checkpoint, max_workers, max_per_source, quiet):
+    # runs the specs that aren't in the checkpoint, writing each result to the store as it completes
+    pending = [spec for spec in specs if _spec_key(spec) not in checkpoint.completed]
+    skipped = len(specs) - len(pending)
+    if skipped > 0 and not quiet:
+        print("{} of {} series already refreshed (from {})".format(skipped, len(specs), checkpoint.path))
+    batch = cryptory._batch(max_per_source)
+    def run(spec):
+        start = time.time()
+        try:
+            return spec, batch._run_spec(spec), None, time.time() - start
+        except Exception as error:
+            # one failure doesn't stop the rest of the run
+            return spec, None, error, time.time() - start
+    completed = []
+    start = time.time()
+    interrupted = False
+    pool = ThreadPool(min(max_workers, len(pending)) or 1)
+    try:
+        for spec, output, error, seconds in pool.imap_unordered(run, pending):
+            rows = 0
+            if error is None:
+                try:
+                    rows = _write(cryptory.store, spec, output)
+                    checkpoint.done(_spec_key(spec), rows)
+                except Exception as store_error:
+                    error = store_error
+            completed.append((spec, rows, error, seconds))
+            if not quiet:
+                print("[{}/{}] {}".format(len(completed), len(pending), _describe(spec, rows, error, seconds)))
+        pool.close()
+    except KeyboardInterrupt:
+        interrupted = True
+        pool.terminate()
+    elapsed = time.time() - start
+    failed = [(spec, error) for spec, _, error, _ in completed if error is not None]
+    print(_summarise(completed, skipped, elapsed, cryptory.metrics.as_dict()))
+    for spec, error in failed:
+        print("failed: {}".format(_describe(spec, 0, error, None)))
+    if interrupted:
+        print("interrupted: rerun to refresh the remaining series")
+        return 130
+    if len(failed) > 0:
+        return 1
+    checkpoint.clear()
+    return 0
+
+
+def _write(store, spec, output):
+    # the result of each spec is kept in the store under its method and argument values
+    method, kwargs, window = spec
+    if 'date' not in output.columns:
+        output = output.reset_index()
+    source, key = method, _spec_label(method, kwargs)
+    coverage = store.coverage(source, key)
+    if coverage is not None and coverage[0] <= _shift_date(window[1], 1) and \
+            coverage[1] >= _shift_date(window[0], -1):
+        # still a single range of dates
+        window = (min(window[0], coverage[0]), max(window[1], coverage[1]))
+    if len(output) > 0:
+        store.update(source, key, output, window)
+    return len(output)
+
+
+def _spec_key(spec):
+    return json.dumps(list(spec), sort_keys=True)
+
+
+def _describe(spec, rows, error, seconds):
+    method, kwargs, window = spec
+    description = "{}({}) from {} to {}".format(
+        method, ", ".join("{}={!r}".format(key, val) for key, val in sorted(kwargs.items())),
+        window[0], window[1])
+    if error is not None:
+        return "{}: {}: {}".format(description, type(error).__name__, error)
+    if seconds is None:
+        return description
+    return "{}: {} rows in {:.2f}s".format(description, rows, seconds)
+
+
+def _summarise(completed, skipped, elapsed, metrics):
+    # overall throughput, then the time spent on each source
+    refreshed = [(spec, rows, seconds) for spec, rows, error, seconds in completed if error is None]
+    rows = sum(rows for _, rows, _ in refreshed)
+    lines = ["refreshed {} series ({} rows) in {:.2f}s: {:.2f} series/s, {:.0f} rows/s "
+             "({} failed, {} already refreshed)".format(
+                 len(refreshed), rows, elapsed, len(refreshed) / elapsed if elapsed > 0 else 0,
+                 rows / elapsed if elapsed > 0 else 0, len(completed) - len(refreshed), skipped)]
+    if len(completed) == 0:
+        return "\n".join(lines)
+    lines.append("{:<26}{:>8}{:>8}{:>10}{:>10}{:>10}{:>10}{:>10}{:>8}".format(
+        'source', 'series', 'failed', 'rows', 'seconds', 'download', 'parse', 'store', 'MB'))
+    for method in sorted(set(spec[0] for spec, _, _, _ in completed)):
+        results = [(rows, error, seconds) for spec, rows, error, seconds in completed if spec[0] == method]
+        totals = metrics.get(method, {'seconds': {}})
+        lines.append("{:<26}{:>8}{:>8}{:>10}{:>10.2f}{:>10.2f}{:>10.2f}{:>10.2f}{:>8.1f}".format(
+            method, len(results), sum(error is not None for _, error, _ in results),
+            sum(rows for rows, _, _ in results), sum(seconds for _, _, seconds in results),
+            *[totals['seconds'].get(phase, 0.0) for phase in _PHASES] +
+            [totals.get('bytes_downloaded', 0) / 1024.0 / 1024.0]))
+    lines.append("(seconds are summed across the series of each source, which run at the same time)")
+    return "\n".join(lines)
+
+
+class _Checkpoint():
+    # the specs completed by earlier runs, saved as each spec completes, and the day
+    # the first of those runs started (so the default to_date, and the specs, don't
+    # change if a run is resumed after midnight)
+
+    def __init__(self, path, restart=False):
+        self.path = os.path.expanduser(path)
+        self.completed = {}
+        self.today = datetime.date.today().strftime("%Y-%m-%d")
+        if not restart and os.path.exists(self.path):
+            with open(self.path) as f:
+                saved = json.load(f)
+            self.completed = saved['completed']
+            self.today = saved.get('today', self.today)
+
+    def done(self, key, rows):
+        self.completed[key] = {'rows': rows, 'finished': time.strftime("%Y-%m-%d %H:%M:%S")}
+        # write then rename, so an interrupted write doesn't lose the progress
+        with open(self.path + '.tmp', 'w') as f:
+            json.dump({'completed': self.completed, 'today': self.today}, f)
+        _replace(self.path + '.tmp', self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -1,23 +1,352 @@
-# python 2
-try:
-    from urllib.request import Request, urlopen  
-# Python 3
-except ImportError:
-    from urllib2 import Request, urlopen
-
+import requests
 import pandas as pd
 import time
 import datetime
 import numpy as np
 import re
 import json
-from bs4 import BeautifulSoup
-from pytrends.request import TrendReq
+import string
+import pickle
+import threading
+import functools
+import copy
+from multiprocessing.pool import ThreadPool
+from io import StringIO
+from .cache import ResponseCache
+from .store import SeriesStore
+from .metrics import Metrics, _NO_PHASE
+from .panel import Panel
+from .indicators import Indicators, returns
+from .retry import RetryPolicy, _TokenBucket
+from .bars import resample_ohlcv
+from .flight import _FLIGHTS, _PageMemo
+from .workers import ParsePool
+
+# full page sources cover every date, as far as the store is concerned
+_EARLIEST_DATE = "1900-01-01"
+# the number of stored days fetched again when a stored series is extended
+_STORE_OVERLAP = 7
+
+def _shift_date(date, days):
+    return (datetime.datetime.strptime(date, "%Y-%m-%d") + 
+            datetime.timedelta(days=days)).strftime("%Y-%m-%d")
+
+# e.g. [new Date("2017/06/21"),2690.5,null]
+_DYGRAPH_ROW = re.compile(r'\[new Date\("(\d{4}[/-]\d{2}[/-]\d{2})"\),([^\]]*)\]')
+
+def _parse_dygraph(parsed_page):
+    # a single pass over the Dygraph data block (rather than rewriting it as json),
+    # returning the dates (datetime64) and a (rows x series) array of values (float64)
+    start_segment = parsed_page.find("new Dygraph")
+    if start_segment == -1:
+        raise ValueError("Could not find the appropriate text tag in the scraped page")
+    start_list = parsed_page.find('[[', start_segment)
+    end_list = parsed_page.find(']]', start_list)
+    rows = _DYGRAPH_ROW.findall(parsed_page, start_list, end_list + 2)
+    dates = np.empty(len(rows), dtype='datetime64[D]')
+    dates[:] = [row[0].replace('/', '-') for row in rows]
+    if len(rows) == 0:
+        return dates, np.empty((0, 1), dtype='float64')
+    values = np.array(','.join([row[1] for row in rows]).replace('null', 'nan').split(','),
+                      dtype='float64')
+    return dates, values.reshape(len(rows), -1)
+
+# e.g. "close":0.0321 (or "volume":12 or "adjclose":null)
+_JSON_KEY = re.compile(br'"(\w+)":')
+_JSON_DIVIDEND = re.compile(br'\{[^{}]*"amount"[^{}]*\}')
+_JSON_LETTERS = string.ascii_letters.encode("ascii")
+
+def _parse_json_columns(parsed_page):
+    # a list of flat json objects of numbers (bytes) straight into one numpy array
+    # per field, with no python object per row (None for anything else, e.g. nulls,
+    # strings or fields that don't line up across objects)
+    body = parsed_page.translate(None, b' \t\r\n')
+    if body == b'[]':
+        return {}
+    # without the digits, every object should look the same (bar decimal points)
+    skeleton = body.translate(None, b'0123456789-+')
+    if not skeleton.startswith(b'[{') or not skeleton.endswith(b'}]'):
+        return None
+    patterns = set(skeleton[2:-2].split(b'},{'))
+    # (keys with digits would lose them in the skeleton, so those are left to json too)
+    keys = _JSON_KEY.findall(body[:body.find(b'}')])
+    expected = b','.join(b'"' + key + b'":' for key in keys)
+    if len(keys) == 0 or not all(key.isalpha() for key in keys) or any(
+            pattern.replace(b'.', b'') != expected for pattern in patterns):
+        return None
+    # a field is an integer unless one of its values has a decimal point
+    decimals = set(i for pattern in patterns for i, field in enumerate(pattern.split(b','))
+                   if b'.' in field)
+    # numbers have no letters (exponents were ruled out above), so the keys go in one pass
+    values = np.fromstring(body.translate(None, b'[]{}":' + _JSON_LETTERS).decode("ascii"), sep=',')
+    if len(values) % len(keys) != 0:
+        return None
+    values = values.reshape(-1, len(keys))
+    return dict((key.decode("utf8"), values[:, i] if i in decimals else values[:, i].astype(np.int64))
+                for i, key in enumerate(keys))
+
+# e.g. <td class="B6">&nbsp;&nbsp;2018 Jan-01 to Jan-05</td> (the week) 
+# followed by five <td class="B3">60.37</td> (the price on each weekday)
+_EIA_CELL = re.compile(r'<td class="?(B6|B3)"?[^>]*>([^<]*)</td>')
+_EIA_WEEK = re.compile(r'(\d{4}) (\w{3})-(\d{2})')
+_MONTHS = dict((month, '{:02d}'.format(i+1)) for i, month in enumerate(
+        ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']))
+
+def _parse_eia(parsed_page):
+    # a single pass over the week (B6) and price (B3) cells of the table
+    # (rather than building the whole document tree), returning the daily 
+    # dates (datetime64) and prices (float64)
+    week_starts = []
+    values = []
+    for cell_class, text in _EIA_CELL.findall(parsed_page):
+        if cell_class == 'B6':
+            year, month, day = _EIA_WEEK.search(text).groups()
+            week_starts.append('-'.join([year, _MONTHS[month], day]))
+        else:
+            values.append(text.strip() or 'nan')
+    week_starts = np.array(week_starts, dtype='datetime64[D]')
+    dates = (week_starts[:, np.newaxis] + np.arange(5)).ravel()
+    output = np.full(len(dates), np.nan)
+    values = np.array(values[:len(dates)], dtype='float64')
+    output[:len(values)] = values
+    return dates, output
+
+_TABLE_ROW = re.compile(r'<tr[^>]*>(.*?)</tr>', re.S | re.I)
+_TABLE_CELL = re.compile(r'<t[dh][^>]*>(.*?)</t[dh]>', re.S | re.I)
+_TAG = re.compile(r'<[^>]+>')
+
+def _parse_table(parsed_page, n_cols):
+    # the rows of the last table on the page with n_cols cells, none of them empty
+    # (like pd.read_html(parsed_page)[-1].dropna(), but without building the whole document)
+    table = parsed_page[parsed_page.lower().rfind('<table'):]
+    output = []
+    for row in _TABLE_ROW.findall(table):
+        cells = [_TAG.sub('', cell).replace('&nbsp;', ' ').strip() 
+                 for cell in _TABLE_CELL.findall(row)]
+        if len(cells) == n_cols and all(cells):
+            output.append(cells)
+    return output
+
+# the parsers below return one numpy array per column, so that they can run in a ParsePool
+
+def _parse_reddit(parsed_page, metric_name):
+    if metric_name == 'rankData':
+        start_segment = parsed_page.find(metric_name)
+    else:
+        start_segment = parsed_page.find("element: '"+metric_name+"'")
+    if start_segment != -1:
+        start_list = parsed_page.find("[", start_segment)
+        end_list = parsed_page.find("]", start_list)
+        parsed_page = parsed_page[start_list:end_list + 1]
+    else:
+        raise ValueError("Could not find that subreddit")
+    parsed_page = parsed_page.replace("'", '"')
+    parsed_page = parsed_page.replace('a', '\"subscriber_count\"')
+    parsed_page = parsed_page.replace('y', '\"date\"')
+    output = json.loads(parsed_page)
+    output = pd.DataFrame(output)
+    output['date'] = pd.to_datetime(output['date'], format="%Y-%m-%d")
+    return _frame_columns(output)
+
+def _parse_exchange_rates(parsed_page):
+    start_segment = parsed_page.find("chart xAxisName")
+    if start_segment != -1:
+        start_list = parsed_page.find("<", start_segment)
+        end_list = parsed_page.find("/></chart>", start_list)
+        parsed_page = parsed_page[start_list:end_list]
+    else:
+        raise ValueError("Could not find the appropriate text tag in the scraped page")
+    parsed_page = re.sub(r" showLabel='[0-9]'", "", parsed_page)
+    parsed_page = parsed_page.replace("'", '"')
+    parsed_page = parsed_page.replace("set ", '')
+    parsed_page = parsed_page.replace("<", "{")
+    parsed_page = parsed_page.replace("/>", "},")
+    parsed_page = parsed_page.replace('label', '\"date\"')
+    parsed_page = parsed_page.replace('value', '\"exch_rate\"')
+    parsed_page = parsed_page.replace('=', ':')
+    parsed_page = parsed_page.replace(' ', ',')
+    output = json.loads('[' + parsed_page + '}]')
+    output = pd.DataFrame(output)
+    output['date'] = pd.to_datetime(output['date'], format="%m/%d/%Y")
+    output['exch_rate'] = pd.to_numeric(output['exch_rate'], errors='coerce')
+    return _frame_columns(output)
+
+_POLONIEX_COLUMNS = ['date', 'close', 'open', 'high', 'low', 'weightedAverage', 'quoteVolume', 'volume']
+
+def _parse_poloniex(parsed_page):
+    # dates are left as unix seconds
+    output = None
+    if parsed_page.lstrip().startswith(b'['):
+        output = _parse_json_columns(parsed_page)
+    if output is None:
+        # e.g. an error message, or rows that don't share the same fields
+        output = json.loads(parsed_page.decode("utf8"))
+        if isinstance(output, dict):
+            if 'error' in list(output.keys()):
+                raise ValueError("The content of the page was not as it should be")
+        output = pd.DataFrame(output)
+        output = dict((col, output[col].values) for col in _POLONIEX_COLUMNS)
+    elif len(output) == 0:
+        output = dict((col, np.empty(0, dtype=np.float64)) for col in _POLONIEX_COLUMNS)
+        output['date'] = np.empty(0, dtype=np.int64)
+    return output
+
+def _parse_yahoo(parsed_page):
+    # dates are left as unix seconds
+    start_segment = parsed_page.find(b'{"prices":')
+    if start_segment != -1:
+        start_list = parsed_page.find(b"[", start_segment)
+        end_list = parsed_page.find(b"]", start_list)
+        parsed_page = parsed_page[start_list:end_list+1]
+    else:
+        raise ValueError("Could not find the appropriate text tag in the scraped page")
+    # dividends mess up the dataframe
+    prices = _JSON_DIVIDEND.sub(b'', parsed_page.translate(None, b' \t\r\n'))
+    output = _parse_json_columns(prices.replace(b'[,', b'[').replace(b',,', b',').replace(b',]', b']'))
+    if output is None:
+        output = pd.DataFrame(json.loads(parsed_page.decode("utf8")))
+        if 'amount' in output.columns:
+            output = output[pd.isnull(output['amount'])]
+            output = output.drop(columns=['amount', 'data', 'type'])
+        output = _frame_columns(output)
+        output['date'] = output['date'].astype(np.int64)
+    return output
+
+_METAL_COLUMNS = ['date', 'gold_am', 'gold_pm','silver', 'platinum_am', 
+                  'platinum_pm', 'palladium_am', 'palladium_pm']
+
+def _parse_metal_prices(parsed_page):
+    output = pd.DataFrame(_parse_table(parsed_page, len(_METAL_COLUMNS)), columns=_METAL_COLUMNS)
+    output['date'] = pd.to_datetime(output['date'])
+    for col in _METAL_COLUMNS[1:]:
+        # prices may include thousands separators, and missing prices are shown as -
+        output[col] = pd.to_numeric(output[col].str.replace(",", "").replace("-", np.nan))
+    return _frame_columns(output)
+
+def _frame_columns(output):
+    return dict((col, output[col].values) for col in output.columns)
+
+def _stitch_trends(windows, kw_list):
+    # each search is rescaled to match the searches before it (on their overlapping dates)
+    # and then only fills the dates not covered by those earlier searches
+    dates = pd.DatetimeIndex(np.unique(np.concatenate([window['date'].values for window in windows])))
+    values = np.full((len(dates), len(kw_list)), np.nan)
+    is_partial = np.empty(len(dates), dtype=object)
+    covered = np.zeros(len(dates), dtype=bool)
+    for i, window in enumerate(windows):
+        if len(window) == 0:
+            continue
+        rows = dates.get_indexer(window['date'])
+        window_values = window[kw_list].values.astype('float64')
+        if i == 0:
+            norm_factor = 1.0
+        else:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                norm_factor = np.ma.masked_invalid(values[rows]/window_values).mean(axis=0)
+            norm_factor = np.ma.filled(norm_factor, np.nan)
+        new_rows = ~covered[rows]
+        values[rows[new_rows]] = window_values[new_rows] * norm_factor
+        is_partial[rows[new_rows]] = window['isPartial'].values[new_rows]
+        covered[rows[new_rows]] = True
+    output = pd.DataFrame(values[covered], columns=kw_list)
+    output.insert(0, 'isPartial', is_partial[covered])
+    output.insert(0, 'date', dates[covered])
+    return output
+
+def _instrumented(method):
+    # records each call of a public method, if metrics are enabled
+    # (and applies the compact schema, if requested)
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.metrics is None:
+            output = method(self, *args, **kwargs)
+        else:
+            with self.metrics.call(method.__name__) as record:
+                output = method(self, *args, **kwargs)
+                # (extract_batch can also return an error report)
+                record['rows'] += len(output[0] if isinstance(output, tuple) else output)
+        if self.compact:
+            if isinstance(output, tuple):
+                return (_compact(output[0]),) + output[1:]
+            output = _compact(output)
+        return output
+    return wrapper
+
+def _compact(output):
+    # categorical labels, float32 values (where precision allows), 
+    # downcast integers and dates as the index
+    if 'date' in output.columns:
+        output = output.set_index('date')
+    elif output.index.name != 'date':
+        return output
+    columns = []
+    # by position, as merged frames can repeat column names
+    for i in range(output.shape[1]):
+        values = output.iloc[:, i]
+        if values.dtype == np.dtype('O') or pd.api.types.is_string_dtype(values.dtype):
+            values = values.astype('category')
+        elif values.dtype == np.dtype('float64'):
+            as_float32 = values.astype('float32')
+            # e.g. values beyond the range of float32
+            if np.allclose(as_float32.values, values.values, rtol=1e-6, equal_nan=True):
+                values = as_float32
+        elif values.dtype.kind in 'iu':
+            values = pd.to_numeric(values, downcast='integer' if values.dtype.kind == 'i' 
+                                   else 'unsigned')
+        columns.append(values)
+    return pd.concat(columns, axis=1)
+
+def _spec_label(method, kwargs):
+    # e.g. 'btc' for ('extract_bitinfocharts', {'coin': 'btc'})
+    values = ["_".join(val) if isinstance(val, list) else str(val)
+              for val in kwargs.values() if not isinstance(val, bool)]
+    if len(values) == 0:
+        return method.split("_", 1)[1]
+    return "_".join(values)
+
+def _date_mask(dates, from_date, to_date):
+    # rows from the start of from_date to the end of to_date (which may have times)
+    return (dates>=from_date) & (dates<_shift_date(to_date, 1))
+
+def _date_values(output):
+    # compact outputs hold the dates in the index
+    if 'date' in output.columns:
+        return output['date']
+    return output.index
+
+def _reset_rows(output):
+    # renumbers the rows (unless the dates are the index)
+    if 'date' in output.columns:
+        return output.reset_index(drop=True)
+    return output
+
+def _phased(phase):
+    # attributes the time spent in a private method to a phase, if metrics are enabled
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.metrics is None:
+                return method(self, *args, **kwargs)
+            with self.metrics.phase(phase):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+# candle lengths (in seconds) offered by poloniex, and the most candles in each request
+_POLONIEX_PERIODS = [300, 900, 1800, 7200, 14400, 86400]
+_POLONIEX_PAGE = 50000
+
+# these methods can download any range of dates
+_RANGE_METHODS = ['extract_coinmarketcap', 'extract_poloniex', 'get_stock_prices', 'get_metal_prices']
+# these methods fill the gaps in the data (when fillgaps is True)
+_FILLED_METHODS = ['get_exchange_rates', 'get_stock_prices', 'get_oil_prices', 'get_metal_prices']
 
 class Cryptory():
     
     def __init__(self, from_date, to_date=None, ascending=False, 
-                 fillgaps=True, timeout=10.0):
+                 fillgaps=True, timeout=10.0, cache=None, store=None, pool_size=10,
+                 metrics=None, compact=False, retry=None, frequency='D', memo_ttl=60,
+                 parse_pool=None):
         """Initialise cryptory class
         
         Parameters
@@ -35,6 +364,35 @@ class Cryptory():
             (defaults to True e.g. Saturday stock price will be same as Friday)
         fillgaps : float. The max time allowed (in seconds) to pull data from a website
             If exceeded, an timeout error is returned. Default is 10 seconds.
+        cache : where to store previously downloaded web pages, so that repeated calls
+            don't hit the network. Either a directory (as string) or a ResponseCache
+            instance (to set per-source expiry times and the max cache size)
+            (default is None i.e. nothing is cached)
+        store : where to keep the historical series retrieved by previous calls, so that
+            only the missing dates are downloaded. Either a directory (as string) or a
+            SeriesStore instance (default is None i.e. the full date range is always downloaded)
+        pool_size : the number of open connections kept for reuse with each website
+            (default is 10)
+        metrics : a Metrics instance that records the time spent (downloading, parsing, 
+            merging etc.), the bytes downloaded, the rows returned and the cache hits of 
+            every call, or True to create one (available as the metrics attribute)
+            (default is None i.e. nothing is recorded)
+        compact : whether to return dataframes with a smaller memory footprint: dates as
+            the index (rather than a date column), labels (e.g. coin names) as categories,
+            float32 rather than float64 values and the smallest possible integer types
+            (default is False)
+        retry : a RetryPolicy instance, setting the retries, backoff, rate limits and
+            circuit breaking of the requests sent to each website, or the number of 
+            retries (default is None i.e. RetryPolicy() with 3 retries)
+        frequency : the interval between rows, as a pandas frequency (e.g. '5min', 'h', 'D');
+            poloniex prices are retrieved at this resolution, while daily sources
+            are filled across each day (default is 'D' i.e. daily)
+        memo_ttl : the number of seconds that full history pages (e.g. a subreddit on 
+            redditmetrics, which holds every metric) are kept in memory for other calls
+            of this cryptory (default is 60, 0 means pages aren't kept)
+        parse_pool : a ParsePool instance, so that large pages are parsed in other processes
+            (on every core); the pool isn't closed by cryptory, so it's best created in
+            a with block (default is None i.e. pages are parsed in this process)
         """
         
         self.from_date = from_date
@@ -46,8 +404,55 @@ class Cryptory():
         self.ascending = ascending
         self.fillgaps = fillgaps
         self.timeout = timeout
-        self._df = pd.DataFrame({'date':pd.date_range(start=self.from_date, end=self.to_date)})
+        self.compact = compact
+        try:
+            # e.g. 'h' is read as '1h'
+            self._seconds = int(pd.Timedelta(frequency if frequency[:1].isdigit() 
+                                             else '1' + frequency).total_seconds())
+        except (ValueError, TypeError):
+            raise ValueError("frequency must be a fixed interval (e.g. '5min', 'h', 'D')")
+        if self._seconds <= 0 or 86400 % self._seconds != 0:
+            raise ValueError("frequency must divide a day (e.g. '5min', 'h', 'D')")
+        self.frequency = frequency
+        if isinstance(retry, RetryPolicy):
+            self.retry = retry
+        elif retry is None:
+            self.retry = RetryPolicy()
+        else:
+            self.retry = RetryPolicy(retries=retry)
+        if cache is None or isinstance(cache, ResponseCache):
+            self.cache = cache
+        else:
+            self.cache = ResponseCache(cache)
+        if store is None or isinstance(store, SeriesStore):
+            self.store = store
+        else:
+            self.store = SeriesStore(store)
+        # identical requests (from any cryptory) share a download, and recent pages
+        # can serve other calls of this cryptory
+        self._flights = _FLIGHTS
+        self._memo = _PageMemo(memo_ttl)
+        if parse_pool is not None and not isinstance(parse_pool, ParsePool):
+            # (the caller owns the pool, so it's the caller that closes it)
+            raise ValueError("parse_pool must be a ParsePool instance")
+        self.parse_pool = parse_pool
+        # limits the number of simultaneous requests to each source (see extract_batch)
+        self._max_per_source = None
+        self._source_limits = {}
+        self._lock = threading.Lock()
+        if metrics is True:
+            self.metrics = Metrics()
+        else:
+            self.metrics = metrics
+        # connections (and compression) are reused across calls
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        # every getter lines up its data against this grid (daily, unless frequency is set)
+        self._dates = self._grid(self.from_date, self.to_date)
         
+    @_instrumented
     def extract_reddit_metrics(self, subreddit, metric, col_label="", sub_col=False):
         """Retrieve daily subscriber data for a specific subreddit scraped from redditmetrics.com
         
@@ -72,35 +477,17 @@ class Cryptory():
             raise ValueError(
                 "Invalid metric: must be one of 'subscriber-growth', " + 
                 "'total-subscribers', 'subscriber-growth-perc', 'rankData'")
-        url = "http://redditmetrics.com/r/" + subreddit
         if metric == 'subscriber-growth-perc':
             metric_name = 'total-subscribers'
         else:
             metric_name = metric
-        try: 
-            parsed_page = urlopen(url, timeout=self.timeout).read()
-            parsed_page = parsed_page.decode("utf8")
-        except:
-            # future versions may split out the different exceptions (e.g. timeout)
-            raise
-        if metric == 'rankData':
-            start_segment = parsed_page.find(metric)
-        else:
-            start_segment = parsed_page.find("element: '"+metric_name+"'")
-        if start_segment != -1:
-            start_list = parsed_page.find("[", start_segment)
-            end_list = parsed_page.find("]", start_list)
-            parsed_page = parsed_page[start_list:end_list + 1]
-        else:
-            return ValueError("Could not find that subreddit")
-        parsed_page = parsed_page.replace("'", '"')
-        parsed_page = parsed_page.replace('a', '\"subscriber_count\"')
-        parsed_page = parsed_page.replace('y', '\"date\"')
-        output = json.loads(parsed_page)
-        output = pd.DataFrame(output)
-        output['date'] = pd.to_datetime(output['date'], format="%Y-%m-%d")
+        # the page always contains the full history
+        output = self._extract_stored('redditmetrics', "_".join([subreddit, metric_name]),
+                                      lambda from_date, to_date: self._fetch_reddit_metrics(
+                                          subreddit, metric_name), full_page=True,
+                                      lookback=1 if metric == 'subscriber-growth-perc' else 0)
         if metric == 'subscriber-growth-perc':
-            output['subscriber_count'] = output['subscriber_count'].pct_change()
+            output['subscriber_count'] = returns(output['subscriber_count'].values)
         output = output[(output['date']>=self.from_date) & (output['date']<=self.to_date)]
         output = output.sort_values(by='date', ascending=self.ascending).reset_index(drop=True)
         if sub_col:
@@ -110,7 +497,15 @@ class Cryptory():
         else:
             output = output.rename(columns={'subscriber_count': metric.replace("-","_")})
         return output
+    
+    @_phased('parse')
+    def _fetch_reddit_metrics(self, subreddit, metric_name):
+        url = "http://redditmetrics.com/r/" + subreddit
+        # the page holds every metric, so it's kept for the other metrics
+        parsed_page = self._fetch_page(url, 'redditmetrics', memo=True)
+        return pd.DataFrame(self._parse(_parse_reddit, parsed_page, metric_name))
         
+    @_instrumented
     def extract_coinmarketcap(self, coin, coin_col=False):
         """Retrieve basic historical information for a specific cryptocurrency from coinmarketcap.com
         
@@ -124,22 +519,31 @@ class Cryptory():
         -------
         pandas Dataframe
         """
-        try:
-            output = pd.read_html("https://coinmarketcap.com/currencies/{}/historical-data/?start={}&end={}".format(
-                coin, self.from_date.replace("-", ""), self.to_date.replace("-", "")))[0]
-        except:
-            # future versions may split out the different exceptions (e.g. timeout)
-            raise
+        output = self._extract_stored('coinmarketcap', coin,
+                                      lambda from_date, to_date: self._fetch_coinmarketcap(
+                                          coin, from_date, to_date))
+        output = output[(output['date']>=self.from_date) & (output['date']<=self.to_date)]
+        output = output.sort_values(by='date', ascending=self.ascending).reset_index(drop=True)
+        if coin_col:
+            output['coin'] = coin
+        return output
+    
+    @_phased('parse')
+    def _fetch_coinmarketcap(self, coin, from_date, to_date):
+        parsed_page = self._fetch_page(
+            "https://coinmarketcap.com/currencies/{}/historical-data/?start={}&end={}".format(
+                coin, from_date.replace("-", ""), to_date.replace("-", "")),
+            'coinmarketcap', immutable=self._is_historical(to_date))
+        output = pd.read_html(StringIO(parsed_page))[0]
         output = output.assign(Date=pd.to_datetime(output['Date']))
         for col in output.columns:
             if output[col].dtype == np.dtype('O'):
                 output.loc[output[col]=="-",col]=0
                 output[col] = output[col].astype('int64')
         output.columns = [re.sub(r"[^a-z]", "", col.lower()) for col in output.columns]
-        if coin_col:
-            output['coin'] = coin
         return output
     
+    @_instrumented
     def extract_bitinfocharts(self, coin, metric="price", coin_col=False, metric_col=False):
         """Retrieve historical data for a specific cyrptocurrency scraped from bitinfocharts.com
         
@@ -147,11 +551,12 @@ class Cryptory():
         ----------
         coin : the code of the cryptocurrency (e.g. 'btc' for bitcoin)
             full range of available coins can be found on bitinfocharts.com
+            a list of codes (e.g. ['btc', 'eth']) retrieves every coin from a single page
         metric : the particular coin information to be retrieved
             (options are limited to those listed on bitinfocharts.com
             including 'price', 'marketcap', 'transactions' and 'sentinusd'
         coin_col : whether to include the coin name as a column
-            (default is False i.e. the column is not included)
+            (only applies to a single coin; default is False i.e. the column is not included)
         metric_col : whether to include the metric name as a column
             (default is False i.e. the column is not included)
             
@@ -159,49 +564,58 @@ class Cryptory():
         -------
         pandas Dataframe
         """
-        if coin not in ['btc', 'eth', 'xrp', 'bch', 'ltc', 'dash', 'xmr', 'btg', 'etc', 'zec', 
-                        'doge', 'rdd', 'vtc', 'ppc', 'ftc', 'nmc', 'blk', 'aur', 'nvc', 'qrk', 'nec']:
+        if isinstance(coin, (list, tuple)):
+            coins = list(coin)
+        else:
+            coins = [coin]
+        if len(coins) == 0 or any(coin not in ['btc', 'eth', 'xrp', 'bch', 'ltc', 'dash', 'xmr', 
+                                                'btg', 'etc', 'zec', 'doge', 'rdd', 'vtc', 'ppc', 
+                                                'ftc', 'nmc', 'blk', 'aur', 'nvc', 'qrk', 'nec']
+                                  for coin in coins):
             raise ValueError("Not a valid coin")
         if metric not in ['transactions', 'size', 'sentbyaddress', 'difficulty', 'hashrate', 'price', 
                           'mining_profitability', 'sentinusd', 'transactionfees', 'median_transaction_fee', 
                         'confirmationtime', 'marketcap', 'transactionvalue', 'mediantransactionvalue',
                          'tweets', 'activeaddresses', 'top100cap']:
             raise ValueError("Not a valid bitinfocharts metric")
-        new_col_name = "_".join([coin, metric])
-        parsed_page = Request("https://bitinfocharts.com/comparison/{}-{}.html".format(metric, coin),
-                            headers = {'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.11 (KHTML, like Gecko) Chrome/23.0.1271.64 Safari/537.11'})
-        try: 
-            parsed_page = urlopen(parsed_page, timeout=self.timeout).read()
-            parsed_page = parsed_page.decode("utf8")
-        except:
-            # future versions may split out the different exceptions (e.g. timeout)
-            raise
-        start_segment = parsed_page.find("new Dygraph")
-        if start_segment != -1:
-            start_list = parsed_page.find('[[', start_segment)
-            end_list = parsed_page.find(']]', start_list)
-            parsed_page = parsed_page[start_list:end_list]
-        else:
-            raise ValueError("Could not find the appropriate text tag in the scraped page")
-        parsed_page = parsed_page.replace('new Date(', '')
-        parsed_page = parsed_page.replace(')', '')
-        parsed_page = parsed_page.replace('null', '0')
-        parsed_page = parsed_page.replace('["', '{"date":"')
-        parsed_page = parsed_page.replace('",', '","{}":'.format(new_col_name))
-        parsed_page = parsed_page.replace('],', '},')
-        parsed_page = parsed_page + '}]'
-        output = json.loads(parsed_page)
-        output = pd.DataFrame(output)
-        output['date'] = pd.to_datetime(output['date'], format="%Y-%m-%d")
+        # the page always contains the full history
+        output = self._extract_stored('bitinfocharts', "_".join(coins + [metric]),
+                                      lambda from_date, to_date: self._fetch_bitinfocharts(
+                                          coins, metric), full_page=True)
         output = output[(output['date']>=self.from_date) & (output['date']<=self.to_date)]
-        # for consistency, put date column first
-        output = output[['date', new_col_name]]
-        if coin_col:
-            output['coin'] = coin
+        if coin_col and len(coins) == 1:
+            output['coin'] = coins[0]
         if metric_col:
             output['metric'] = metric
         return output.sort_values(by='date', ascending=self.ascending).reset_index(drop=True)
     
+    @_phased('parse')
+    def _fetch_bitinfocharts(self, coins, metric):
+        # comparison pages hold one series per coin in the url
+        prefix = "https://bitinfocharts.com/comparison/{}-".format(metric)
+        # so a recent page of more coins (e.g. btc and eth) also serves fewer (e.g. btc)
+        page_coins, parsed_page = coins, None
+        for url, page in self._memo.items():
+            if url.startswith(prefix) and set(coins) <= set(url[len(prefix):-len(".html")].split("-")):
+                page_coins, parsed_page = url[len(prefix):-len(".html")].split("-"), page.decode("utf8")
+                self._count('memo_hits')
+                break
+        if parsed_page is None:
+            parsed_page = self._fetch_page(prefix + "-".join(coins) + ".html", 'bitinfocharts', memo=True,
+                                headers = {'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.11 (KHTML, like Gecko) Chrome/23.0.1271.64 Safari/537.11'})
+        dates, values = self._parse(_parse_dygraph, parsed_page)
+        if values.shape[1] != len(page_coins):
+            raise ValueError("The content of the page was not as it should be")
+        if page_coins != coins:
+            values = values[:, [page_coins.index(coin) for coin in coins]]
+        # missing values are treated as zero
+        values[np.isnan(values)] = 0
+        output = pd.DataFrame(values, columns=["_".join([coin, metric]) for coin in coins])
+        # for consistency, put date column first
+        output.insert(0, 'date', dates.astype('datetime64[ns]'))
+        return output
+    
+    @_instrumented
     def extract_poloniex(self, coin1, coin2, coin1_col=False, coin2_col=False):
         """Retrieve the historical price of one coin relative to another (currency pair) from poloniex
         
@@ -219,27 +633,27 @@ class Cryptory():
         Returns
         -------
         pandas Dataframe
+        
+        Notes
+        -----
+        Prices are retrieved at the frequency of the cryptory. Poloniex offers
+        candles of 5, 15 and 30 minutes, 2 and 4 hours and 1 day; any other frequency
+        (e.g. 'h') is built from the closest finer candles (see resample_ohlcv)
         """
-            
-        from_date = int(time.mktime(time.strptime(self.from_date, "%Y-%m-%d")))
-        to_date = int(time.mktime(time.strptime(self.to_date, "%Y-%m-%d")))
-        url = "https://poloniex.com/public?command=returnChartData&currencyPair={}_{}&start={}&end={}&period=86400".format(
-                coin1.upper(), coin2.upper(), from_date, to_date)
-        try: 
-            parsed_page = urlopen(url, timeout=self.timeout).read()
-            parsed_page = parsed_page.decode("utf8")
-        except:
-            # future versions may split out the different exceptions (e.g. timeout)
-            raise
-        output = json.loads(parsed_page)
-        if isinstance(output, dict):
-            if 'error' in list(output.keys()):
-                raise ValueError("The content of the page was not as it should be")
-        output = pd.DataFrame(output)
-        # more intuitive column order
-        output = output[['date', 'close', 'open', 'high', 'low', 
-                        'weightedAverage', 'quoteVolume', 'volume']]
-        output['date'] = pd.to_datetime(output['date'], unit='s')
+        # the longest candles that fit a whole number of times into each row
+        period = max(period for period in _POLONIEX_PERIODS if self._seconds % period == 0) \
+            if self._seconds % _POLONIEX_PERIODS[0] == 0 else None
+        if period is None:
+            raise ValueError("poloniex frequency must be a multiple of 5 minutes")
+        key = "_".join([coin1.upper(), coin2.upper()])
+        if period != 86400:
+            key = "_".join([key, str(period)])
+        output = self._extract_stored('poloniex', key,
+                                      lambda from_date, to_date: self._fetch_poloniex(
+                                          coin1, coin2, from_date, to_date, period))
+        output = output[_date_mask(output['date'], self.from_date, self.to_date)]
+        if period != self._seconds:
+            output = resample_ohlcv(output, self.frequency)
         output = output.sort_values(by='date', ascending=self.ascending).reset_index(drop=True)
         if coin1_col:
             output['coin1'] = coin1
@@ -247,6 +661,36 @@ class Cryptory():
             output['coin2'] = coin2
         return output
     
+    def _fetch_poloniex(self, coin1, coin2, from_date, to_date, period=86400):
+        start = int(time.mktime(time.strptime(from_date, "%Y-%m-%d")))
+        # the last candle of to_date
+        end = int(time.mktime(time.strptime(to_date, "%Y-%m-%d"))) + 86400 - period
+        # each request returns a limited number of candles, so long ranges are split into pages
+        pages = [(page_start, min(page_start + (_POLONIEX_PAGE - 1) * period, end)) 
+                 for page_start in range(start, end + 1, _POLONIEX_PAGE * period)]
+        fetch = lambda page: self._fetch_poloniex_page(coin1, coin2, page[0], page[1], period)
+        if len(pages) == 1:
+            return fetch(pages[0])
+        pool = ThreadPool(min(4, len(pages)))
+        try:
+            output = pool.map(self._carry(fetch), pages)
+        finally:
+            pool.close()
+        return pd.concat(output).reset_index(drop=True)
+    
+    @_phased('parse')
+    def _fetch_poloniex_page(self, coin1, coin2, start, end, period):
+        url = "https://poloniex.com/public?command=returnChartData&currencyPair={}_{}&start={}&end={}&period={}".format(
+                coin1.upper(), coin2.upper(), start, end, period)
+        parsed_page = self._fetch_page(url, 'poloniex', immutable=self._is_historical(
+            time.strftime("%Y-%m-%d", time.localtime(end))), decode=False)
+        output = self._parse(_parse_poloniex, parsed_page)
+        # unix seconds, converted all at once
+        output['date'] = pd.to_datetime(output['date'], unit='s')
+        # more intuitive column order
+        return pd.DataFrame(output, columns=_POLONIEX_COLUMNS)
+    
+    @_instrumented
     def get_exchange_rates(self, from_currency="USD", to_currency="EUR", 
                                  from_col=False, to_col=False):
         """Retrieve the historical exchange rate between two (fiat) currencies
@@ -264,36 +708,9 @@ class Cryptory():
         -------
         pandas Dataframe
         """
-        n_days = (datetime.date.today() - 
-                  datetime.datetime.strptime(self.from_date, "%Y-%m-%d").date()).days + 1
-        url = "https://www.indexmundi.com/xrates/graph.aspx?c1={}&c2={}&days={}".format(
-            from_currency, to_currency, n_days)
-        try: 
-            parsed_page = urlopen(url, timeout=self.timeout).read()
-            parsed_page = parsed_page.decode("utf8")
-        except:
-            # future versions may split out the different exceptions (e.g. timeout)
-            raise
-        start_segment = parsed_page.find("chart xAxisName")
-        if start_segment != -1:
-            start_list = parsed_page.find("<", start_segment)
-            end_list = parsed_page.find("/></chart>", start_list)
-            parsed_page = parsed_page[start_list:end_list]
-        else:
-            raise ValueError("Could not find the appropriate text tag in the scraped page")
-        parsed_page = re.sub(r" showLabel='[0-9]'", "", parsed_page)
-        parsed_page = parsed_page.replace("'", '"')
-        parsed_page = parsed_page.replace("set ", '')
-        parsed_page = parsed_page.replace("<", "{")
-        parsed_page = parsed_page.replace("/>", "},")
-        parsed_page = parsed_page.replace('label', '\"date\"')
-        parsed_page = parsed_page.replace('value', '\"exch_rate\"')
-        parsed_page = parsed_page.replace('=', ':')
-        parsed_page = parsed_page.replace(' ', ',')
-        output = json.loads('[' + parsed_page + '}]')
-        output = pd.DataFrame(output)
-        output['date'] = pd.to_datetime(output['date'], format="%m/%d/%Y")
-        output['exch_rate'] = pd.to_numeric(output['exch_rate'], errors='coerce')
+        output = self._extract_stored('indexmundi', "_".join([from_currency, to_currency]),
+                                      lambda from_date, to_date: self._fetch_exchange_rates(
+                                          from_currency, to_currency, from_date))
         if from_col:
             output['from_currency'] = from_currency
         if to_col:
@@ -301,6 +718,17 @@ class Cryptory():
         output = self._merge_fill_filter(output)
         return output
     
+    @_phased('parse')
+    def _fetch_exchange_rates(self, from_currency, to_currency, from_date):
+        # this site only accepts the number of days up to the current day
+        n_days = (datetime.date.today() - 
+                  datetime.datetime.strptime(from_date, "%Y-%m-%d").date()).days + 1
+        url = "https://www.indexmundi.com/xrates/graph.aspx?c1={}&c2={}&days={}".format(
+            from_currency, to_currency, n_days)
+        parsed_page = self._fetch_page(url, 'indexmundi')
+        return pd.DataFrame(self._parse(_parse_exchange_rates, parsed_page))
+    
+    @_instrumented
     def get_stock_prices(self, market, market_name=None):
         """Retrieve the historical price (or value) of a publically listed stock or index
         
@@ -320,38 +748,29 @@ class Cryptory():
         This method scrapes data from yahoo finance, so it only works when the historical
         data is presented on the site (which is not the case for a large number of stocks/indices).
         """
-        from_date = int(time.mktime(time.strptime(self.from_date, "%Y-%m-%d")))
-        # we want the daily data
-        # this site works off unix time (86400 seconds = 1 day)
-        to_date = int(time.mktime(time.strptime(self.to_date, "%Y-%m-%d"))) + 86400
-        url = "https://finance.yahoo.com/quote/{}/history?period1={}&period2={}&interval=1d&filter=history&frequency=1d".format(
-        market, from_date,  to_date)
-        try: 
-            parsed_page = urlopen(url, timeout=1).read()
-            parsed_page = parsed_page.decode("utf8")
-        except:
-            # future versions may split out the different exceptions (e.g. timeout)
-            raise
-        start_segment = parsed_page.find('{\"prices\":')
-        if start_segment != -1:
-            start_list = parsed_page.find("[", start_segment)
-            end_list = parsed_page.find("]", start_list)
-            parsed_page = parsed_page[start_list:end_list+1]
-        else:
-            raise ValueError("Could not find the appropriate text tag in the scraped page")
-        output = json.loads(parsed_page)
-        output = pd.DataFrame(output)
-        output['date'] = pd.to_datetime(output['date'],unit='s').apply(lambda x: x.date())
-        output['date'] = pd.to_datetime(output['date'])
-        # dividends mess up the dataframe
-        if 'amount' in output.columns:
-            output = output[pd.isnull(output['amount'])]
-            output = output.drop(columns=['amount', 'data', 'type'])
+        output = self._extract_stored('yahoo', market,
+                                      lambda from_date, to_date: self._fetch_stock_prices(
+                                          market, from_date, to_date))
         if market_name is not None:
             output['market_name'] = market_name
         output = self._merge_fill_filter(output)
         return output
     
+    @_phased('parse')
+    def _fetch_stock_prices(self, market, from_date, to_date):
+        # we want the daily data
+        # this site works off unix time (86400 seconds = 1 day)
+        url = "https://finance.yahoo.com/quote/{}/history?period1={}&period2={}&interval=1d&filter=history&frequency=1d".format(
+        market, int(time.mktime(time.strptime(from_date, "%Y-%m-%d"))),
+        int(time.mktime(time.strptime(to_date, "%Y-%m-%d"))) + 86400)
+        parsed_page = self._fetch_page(url, 'yahoo', immutable=self._is_historical(to_date),
+                                       decode=False)
+        output = pd.DataFrame(self._parse(_parse_yahoo, parsed_page))
+        # unix seconds to days (prices are timestamped during the trading day)
+        output['date'] = pd.to_datetime(output['date'].values // 86400 * 86400, unit='s')
+        return output
+    
+    @_instrumented
     def get_oil_prices(self):
         """Retrieve the historical oil price (London Brent crude)
         
@@ -368,61 +787,43 @@ class Cryptory():
         If you get timeout errors, then increase the timeout argument when
         you initalise the cryptory class
         """
-        try: 
-            parsed_page = urlopen("https://www.eia.gov/dnav/pet/hist/LeafHandler.ashx?n=PET&s=RWTC&f=D",
-                                          timeout=self.timeout).read()
-            parsed_page = parsed_page.decode("utf8")
-        except:
-            # future versions may split out the different exceptions (e.g. timeout)
-            #return pd.DataFrame({"error":e}, index=[0])
-            raise
-        souped_page = BeautifulSoup(parsed_page, 'html.parser')
-        souped_values = [soups.text for soups in souped_page.findAll("td", {"class": "B3"})]
-        souped_dates = [datetime.datetime.strptime(
-                re.sub('\xa0\xa0| to .*','', soups.text), '%Y %b-%d') 
-                        for soups in souped_page.findAll("td", {"class": "B6"})]
-        output = []
-        for i in range(5):
-            output.append(pd.DataFrame({"date":[date + datetime.timedelta(days=i) 
-                                                for date in souped_dates],
-                           "oil_price":souped_values[i::5]}))
-        output = pd.concat(output)
-        output.loc[output['oil_price']=="",'oil_price']=np.nan
-        output['oil_price'] = pd.to_numeric(output['oil_price'])
+        # the page always contains the full history
+        output = self._extract_stored('eia', 'oil_price',
+                                      lambda from_date, to_date: self._fetch_oil_prices(),
+                                      full_page=True)
         output = self._merge_fill_filter(output)
         return output
     
-    def get_metal_prices(self):
+    @_phased('parse')
+    def _fetch_oil_prices(self):
+        parsed_page = self._fetch_page("https://www.eia.gov/dnav/pet/hist/LeafHandler.ashx?n=PET&s=RWTC&f=D",
+                                       'eia')
+        dates, values = self._parse(_parse_eia, parsed_page)
+        output = pd.DataFrame({'date': dates.astype('datetime64[ns]'), 'oil_price': values})
+        return output[['date', 'oil_price']]
+    
+    @_instrumented
+    def get_metal_prices(self, max_workers=4):
         """Retrieve the historical price of gold, silver, platinum and palladium
         
         Parameters
         ----------
+        max_workers : the number of years that can be downloaded at the same time
+            (default is 4)
             
         Returns
         -------
         pandas Dataframe
+        
+        Notes
+        -----
+        Each year is a separate page. Past years won't change, so (with a store) 
+        they're only ever downloaded once and later calls just fetch the current year
         """
-            
-        current_year = datetime.datetime.now().year
-        from_year = datetime.datetime.strptime(self.from_date, "%Y-%m-%d").year
-        to_year = datetime.datetime.strptime(self.to_date, "%Y-%m-%d").year
-        if to_year is None:
-            to_year = current_year
-        output = []
-        for i in range(from_year, to_year+1):
-            if i==current_year:
-                output.append(pd.read_html("http://www.kitco.com/gold.londonfix.html")[-1])
-            else:
-                output.append(pd.read_html("http://www.kitco.com/londonfix/gold.londonfix"+
-                                       str(i)[-2:]+".html")[-1])
-        output = pd.concat(output).dropna()
-        output.columns = ['date', 'gold_am', 'gold_pm','silver', 'platinum_am', 
-                          'platinum_pm', 'palladium_am', 'palladium_pm']
-        output = output.assign(date=pd.to_datetime(output['date']))
-        for col in output.select_dtypes(include=['object']):
-            output.loc[output[col]=="-",col]=np.nan
-            output[col] = output[col].astype('float64')
-        output = pd.merge(self._df, output, on="date", how="left")
+        output = self._extract_stored('kitco', 'londonfix', 
+                                      lambda from_date, to_date: self._fetch_metal_prices(
+                                          from_date, to_date, max_workers))
+        output = self._reindex([output])
         if self.fillgaps:
             for old_val, new_val in zip(['gold_am', 'gold_pm', 'platinum_am', 'platinum_pm',
                                          'palladium_am', 'palladium_pm'],
@@ -430,15 +831,34 @@ class Cryptory():
                                          'palladium_pm', 'palladium_am']):
                 output.loc[output[old_val].isnull(), old_val]= output.loc[output[old_val].isnull(), 
                                                                           new_val]
-            output = output.fillna(method='ffill')
-        output = output.sort_values(by='date', ascending=self.ascending).reset_index(drop=True)
-        output = output[(output['date']>=self.from_date) & (output['date']<=self.to_date)]
-        return output
+        return self._fill_order(output)
     
+    def _fetch_metal_prices(self, from_date, to_date, max_workers):
+        years = list(range(int(from_date[:4]), int(to_date[:4])+1))
+        pool = ThreadPool(min(max_workers, len(years)))
+        try:
+            output = pool.map(self._carry(self._fetch_metal_year), years)
+        finally:
+            pool.close()
+        output = pd.concat(output)
+        output = output[(output['date']>=from_date) & (output['date']<=to_date)]
+        return output.reset_index(drop=True)
+    
+    @_phased('parse')
+    def _fetch_metal_year(self, year):
+        if year==datetime.datetime.now().year:
+            parsed_page = self._fetch_page("http://www.kitco.com/gold.londonfix.html", 'kitco')
+        else:
+            # past years are complete, so the page won't change
+            parsed_page = self._fetch_page("http://www.kitco.com/londonfix/gold.londonfix"+
+                                           str(year)[-2:]+".html", 'kitco', immutable=True)
+        return pd.DataFrame(self._parse(_parse_metal_prices, parsed_page), columns=_METAL_COLUMNS)
+    
+    @_instrumented
     def get_google_trends(self, kw_list, trdays=250, overlap=100, 
                           cat=0, geo='', tz=360, gprop='', hl='en-US',
                           sleeptime=1, isPartial_col=False, 
-                          from_start=False, scale_cols=True):
+                          from_start=False, scale_cols=True, max_workers=4):
         """Retrieve daily google trends data for a list of search terms
         
         Parameters
@@ -456,7 +876,8 @@ class Cryptory():
             available options are 'images', 'news', 'youtube' or 'froogle'
             default is '', which refers to web searches - see pyTrends for more details
         hl : language (e.g. 'en-US' (default), 'es') - see pyTrends for more details
-        sleeptime : when stiching multiple searches, this sets the period between each
+        sleeptime : when stiching multiple searches, this sets the average period between each
+            (searches run in parallel, but no more often than this allows)
         isPartial_col : remove the isPartial column 
             (default is True i.e. column is removed)
         from_start : when stitching multiple results, this determines whether searches
@@ -465,6 +886,8 @@ class Cryptory():
         scale_cols : google trend searches traditionally returns scores between 0 and 100
             stitching could produce values greater than 100
             by setting this to True (default), the values will range between 0 and 100
+        max_workers : when stitching multiple searches, the number of searches that can
+            run at the same time (default is 4)
         
         Returns
         -------
@@ -484,12 +907,12 @@ class Cryptory():
             raise ValueError("trdays must not exceed 270")
         if overlap>=trdays:
             raise ValueError("Overlap can't exceed search days")
+        # pytrends takes a while to import, so it's only loaded when it's needed
+        from pytrends.request import TrendReq
         stich_overlap = trdays - overlap
         from_date = datetime.datetime.strptime(self.from_date, '%Y-%m-%d')
         to_date = datetime.datetime.strptime(self.to_date, '%Y-%m-%d')
         n_days = (to_date - from_date).days
-        # launch pytrends request
-        _pytrends = TrendReq(hl=hl, tz=tz)
         # get the dates for each search
         if n_days <= trdays:
             trend_dates = [' '.join([self.from_date, self.to_date])]
@@ -501,34 +924,37 @@ class Cryptory():
                                           stich_overlap)]
         if from_start:
             trend_dates = trend_dates[::-1]
+        # pytrends requests aren't thread safe, so each thread launches its own
+        pytrends_local = threading.local()
+        rate_limit = _TokenBucket(1.0/sleeptime if sleeptime > 0 else None)
+        def fetch_window(timeframe):
+            # each search is cached separately, so reruns only fetch the recent windows
+            cache_key = json.dumps([kw_list, cat, geo, tz, gprop, hl, timeframe])
+            if self.cache is not None:
+                cached = self.cache.get('google_trends', cache_key, 
+                                        immutable=self._is_historical(timeframe[-10:]))
+                if cached is not None:
+                    return pickle.loads(cached)
+            if not hasattr(pytrends_local, 'pytrends'):
+                pytrends_local.pytrends = TrendReq(hl=hl, tz=tz)
+            def search():
+                rate_limit.acquire()
+                pytrends_local.pytrends.build_payload(kw_list, cat=cat, timeframe=timeframe, 
+                                                      geo=geo, gprop=gprop)
+                return pytrends_local.pytrends.interest_over_time()
+            window = self.retry.call("https://trends.google.com", search, 
+                                     on_retry=self._count_retry).reset_index()
+            if self.cache is not None:
+                self.cache.set('google_trends', cache_key, pickle.dumps(window, protocol=2))
+            return window
+        pool = ThreadPool(min(max_workers, len(trend_dates)))
         try:
-            _pytrends.build_payload(kw_list, cat=cat, timeframe=trend_dates[0], 
-                                   geo=geo, gprop=gprop)
-        except:
-            raise
-        output = _pytrends.interest_over_time().reset_index()
-        if len(output)==0:
+            windows = pool.map(self._carry(fetch_window), trend_dates)
+        finally:
+            pool.close()
+        if len(windows[0])==0:
             raise ValueError('search term returned no results (insufficient data)')
-        for date in trend_dates[1:]:
-            time.sleep(sleeptime)
-            try:
-                _pytrends.build_payload(kw_list, cat=cat, timeframe=date, 
-                                         geo=geo, gprop=gprop)
-            except:
-                raise
-            temp_trend = _pytrends.interest_over_time().reset_index()
-            temp_trend = temp_trend.merge(output, on="date", how="left")
-            # it's ugly but we'll exploit the common column names
-            # and then rename the underscore containing column names
-            for kw in kw_list:
-                norm_factor = np.ma.masked_invalid(temp_trend[kw+'_y']/temp_trend[kw+'_x']).mean()
-                temp_trend[kw] = temp_trend[kw+'_x'] * norm_factor
-            temp_trend =  temp_trend[temp_trend.isnull().any(axis=1)]
-            temp_trend['isPartial'] = temp_trend['isPartial_x']
-            output = pd.concat([output, temp_trend[['date', 'isPartial'] + kw_list]], axis=0, sort=False)
-        
-        # reorder columns in alphabetical order
-        output = output[['date', 'isPartial']+kw_list]
+        output = _stitch_trends(windows, kw_list)
         
         if not isPartial_col:
             output = output.drop('isPartial', axis=1)
@@ -541,15 +967,511 @@ class Cryptory():
                 output[col] = 100.0*output[col]/max_val
         output = output.sort_values('date', ascending=self.ascending).reset_index(drop=True)
         return output
-
     
-    def _merge_fill_filter(self, other_df):
-        output = pd.merge(self._df, other_df, on="date", how="left")
-        output = output.sort_values(by='date', ascending=self.ascending).reset_index(drop=True)
+    @_instrumented
+    def merge_frames(self, frames):
+        """Combine several cryptory dataframes into one, aligned on date
+        
+        Parameters
+        ----------
+        frames : list of pandas Dataframes (each with a date column)
+            e.g. the outputs of get_stock_prices and get_oil_prices
+            
+        Returns
+        -------
+        pandas Dataframe
+        
+        Notes
+        -----
+        Rows are restricted to the dates between from_date and to_date, with
+        gaps filled (if fillgaps is True) and ordered (by ascending) just once
+        """
+        return self._fill_order(self._reindex(frames))
+    
+    def iter_chunks(self, method, chunk='year', **kwargs):
+        """Retrieve data in chunks of dates, rather than all at once
+        
+        Parameters
+        ----------
+        method : the name of the cryptory method (e.g. 'extract_poloniex')
+        chunk : the dates covered by each chunk: either 'year' (each calendar year)
+            or a number of days (default is 'year')
+        kwargs : the arguments of the method (e.g. coin1='btc', coin2='eth')
+            
+        Returns
+        -------
+        generator of pandas Dataframes
+        
+        Notes
+        -----
+        Chunks are returned oldest first (rows within each chunk are ordered by ascending).
+        Sources that accept a date range (and every source, once it's in the store) are 
+        downloaded one chunk at a time. Other sources only offer the full history, so it's
+        downloaded and parsed once and then split into chunks.
+        """
+        windows = self._chunk_windows(chunk)
+        if method in _RANGE_METHODS or self.store is not None:
+            chunks = (getattr(self._window(from_date, to_date), method)(**kwargs)
+                      for from_date, to_date in windows)
+            if method in _FILLED_METHODS:
+                chunks = self._fill_across(chunks)
+        else:
+            full_output = getattr(self, method)(**kwargs)
+            dates = _date_values(full_output)
+            chunks = (_reset_rows(full_output[_date_mask(dates, from_date, to_date)])
+                      for from_date, to_date in windows)
+        for output in chunks:
+            yield output
+    
+    def iter_merged_chunks(self, specs, chunk='year'):
+        """Retrieve the data of several cryptory methods in chunks of dates, aligned on date
+        
+        Parameters
+        ----------
+        specs : list of (method name, dict of arguments) pairs
+            e.g. [('extract_bitinfocharts', {'coin': 'btc'}), 
+                  ('get_stock_prices', {'market': '%5EDJI'})]
+        chunk : the dates covered by each chunk: either 'year' (each calendar year)
+            or a number of days (default is 'year')
+            
+        Returns
+        -------
+        generator of pandas Dataframes
+        
+        Notes
+        -----
+        Each chunk is combined as in merge_frames, so only one chunk of each
+        source is held in memory at a time (see iter_chunks)
+        """
+        iterators = [self.iter_chunks(method, chunk, **kwargs) for method, kwargs in specs]
+        def merged_chunks():
+            for from_date, to_date in self._chunk_windows(chunk):
+                yield self._window(from_date, to_date).merge_frames(
+                    [next(iterator) for iterator in iterators])
+        for output in self._fill_across(merged_chunks()):
+            yield output
+    
+    @_instrumented
+    def extract_batch(self, specs, max_workers=8, max_per_source=4, errors='raise'):
+        """Run many cryptory methods concurrently and join the results on date
+        
+        Parameters
+        ----------
+        specs : list of (method name, dict of arguments) pairs
+            e.g. [('extract_bitinfocharts', {'coin': 'btc'}), 
+                  ('extract_poloniex', {'coin1': 'btc', 'coin2': 'eth'})]
+        max_workers : the number of requests that can run at the same time
+            (default is 8)
+        max_per_source : the number of requests that can be sent to the same website
+            at the same time (default is 4)
+        errors : 'raise' (any failed spec raises its error) or 'report' (failed specs
+            are left out and returned in a report) (default is 'raise')
+            
+        Returns
+        -------
+        pandas Dataframe (or, if errors is 'report', a tuple of the dataframe and 
+        a report of the failed specs, see Notes)
+        
+        Notes
+        -----
+        Columns appearing in more than one result (e.g. 'close' for two poloniex
+        currency pairs) are suffixed with the argument values of each spec
+        (e.g. 'close_btc_eth'). The report is a pandas Dataframe with the method, 
+        arguments and error of each failed spec (if every spec fails, the first 
+        error is raised)
+        """
+        specs, results, report = self._run_specs(specs, max_workers, max_per_source, errors)
+        output = self._join([_spec_label(method, kwargs) for method, kwargs in specs], results)
+        if errors == 'report':
+            return output, report
+        return output
+    
+    def extract_panel(self, specs, max_workers=8, max_per_source=4, errors='raise'):
+        """Run many cryptory methods concurrently and collect the results into a panel
+        
+        Parameters
+        ----------
+        specs : list of (method name, dict of arguments) pairs
+            e.g. [('extract_bitinfocharts', {'coin': 'btc'}), 
+                  ('extract_bitinfocharts', {'coin': 'eth'})]
+        max_workers : the number of requests that can run at the same time
+            (default is 8)
+        max_per_source : the number of requests that can be sent to the same website
+            at the same time (default is 4)
+        errors : 'raise' (any failed spec raises its error) or 'report' (failed specs
+            are left out and returned in a report, as in extract_batch) 
+            (default is 'raise')
+            
+        Returns
+        -------
+        cryptory Panel (or, if errors is 'report', a tuple of the panel and a report)
+        
+        Notes
+        -----
+        Each spec is an asset named after its argument values (e.g. 'btc', or 
+        'btc_eth' for a poloniex currency pair) or, if it has none, the method 
+        (e.g. 'oil_prices'). The panel can be retrieved in long format (panel.long()), 
+        wide format (panel.wide() or e.g. panel.wide('close')) or as returns 
+        (panel.returns()) and their correlations (panel.correlation())
+        """
+        specs, results, report = self._run_specs(specs, max_workers, max_per_source, errors)
+        with self._phase('merge'):
+            output = Panel(self._dates, [(_spec_label(method, kwargs), result) 
+                                         for (method, kwargs), result in zip(specs, results)],
+                           ascending=self.ascending, fillgaps=self.fillgaps)
+        if errors == 'report':
+            return output, report
+        return output
+    
+    def lazy(self):
+        """Start a query that isn't run until its collect method is called
+        
+        Returns
+        -------
+        object with each cryptory method that retrieves data (extract_poloniex, 
+        get_stock_prices etc.), returning a LazyFrame (see help(LazyFrame))
+        
+        Notes
+        -----
+        e.g. my_cryptory.lazy().extract_bitinfocharts("btc").join(
+                 my_cryptory.lazy().get_stock_prices("%5EDJI")).filter(
+                 "2018-01-01", "2018-03-31").select("btc_price", "close").collect()
+        only downloads the first 3 months of 2018 (for the sources that accept a 
+        date range, or once they're in the store)
+        """
+        from .lazy import _LazySources
+        return _LazySources(self)
+    
+    @_instrumented
+    def get_indicators(self, method, windows=(7, 30), **kwargs):
+        """Retrieve the returns, rolling means and rolling volatility of a cryptory method
+        
+        Parameters
+        ----------
+        method : the name of the cryptory method (e.g. 'extract_poloniex')
+        windows : list of the numbers of rows in each rolling window, i.e. days at the
+            default daily frequency, hours with frequency='h' (default is (7, 30))
+        kwargs : the arguments of the method (e.g. coin1='btc', coin2='eth')
+            
+        Returns
+        -------
+        pandas Dataframe
+        
+        Notes
+        -----
+        See help(Indicators) for the columns. If the cryptory has a store, the 
+        indicators are kept alongside the stored series, so only new days are 
+        calculated on later calls
+        """
+        output = getattr(self, method)(**kwargs)
+        key = "_".join([method, _spec_label(method, kwargs)])
+        if self._seconds != 86400:
+            # (as with the stored poloniex series)
+            key = "_".join([key, str(self._seconds)])
+        return Indicators(windows, store=self.store).compute(output, key=key)
+    
+    def _join(self, labels, results, columns=None):
+        # columns appearing in more than one result are suffixed with the label of each
+        # (columns are the column names of each result to check, if not all of them)
+        col_counts = {}
+        for result_columns in (columns or [result.columns for result in results]):
+            for col in result_columns:
+                col_counts[col] = col_counts.get(col, 0) + 1
+        if self._seconds < 86400:
+            # daily sources (e.g. bitinfocharts) are filled across each day
+            results = [self._spread_daily(result) for result in results]
+        output = []
+        for label, result in zip(labels, results):
+            result = result.rename(columns={col: "_".join([col, label]) for col in result.columns
+                                            if col != 'date' and col_counts.get(col, 0) > 1})
+            if 'date' in result.columns:
+                result = result.set_index('date')
+            output.append(result)
+        # a single join across all results
+        output = pd.concat(output, axis=1, join='outer', sort=False)
+        output.index.name = 'date'
+        output = output.reset_index()
+        return output.sort_values(by='date', ascending=self.ascending).reset_index(drop=True)
+    
+    @_phased('merge')
+    def _spread_daily(self, result):
+        # a result with one row per day, lined up against the (intraday) grid
+        dates = pd.DatetimeIndex(_date_values(result))
+        if len(result) == 0 or (dates != dates.normalize()).any():
+            return result
+        if 'date' in result.columns:
+            result = result.set_index('date')
+        if not result.index.is_unique:
+            result = result[~result.index.duplicated(keep='last')]
+        result = result.sort_index().reindex(self._dates)
         if self.fillgaps:
-            if self.ascending:
-                output = output.fillna(method='ffill')
+            result = result.ffill(limit=86400 // self._seconds - 1)
+        return result
+    
+    def _run_specs(self, specs, max_workers, max_per_source, errors='raise'):
+        # returns the specs that succeeded, their results and a report of the failures
+        # each spec may also have a (from_date, to_date) window, replacing those of the cryptory
+        if errors not in ['raise', 'report']:
+            raise ValueError("errors must be 'raise' or 'report'")
+        self._check_specs(specs)
+        batch = self._batch(max_per_source)
+        def run(spec):
+            try:
+                return batch._run_spec(spec), None
+            except Exception as error:
+                if errors == 'raise':
+                    raise
+                # one failure doesn't stop the rest of the batch
+                return None, error
+        pool = ThreadPool(min(max_workers, len(specs)) or 1)
+        try:
+            outcomes = pool.map(run, specs)
+        finally:
+            pool.close()
+        failed = [(spec, error) for spec, (_, error) in zip(specs, outcomes) if error is not None]
+        if len(failed) == len(specs) and len(specs) > 0:
+            raise failed[0][1]
+        report = pd.DataFrame([(spec[0], spec[1], error) for spec, error in failed],
+                              columns=['method', 'arguments', 'error'])
+        return ([spec for spec, (_, error) in zip(specs, outcomes) if error is None],
+                [result for result, error in outcomes if error is None], report)
+    
+    def _check_specs(self, specs):
+        for method in [spec[0] for spec in specs]:
+            if not method.startswith(('extract_', 'get_')) or method in [
+                    'extract_batch', 'extract_panel', 'get_indicators']:
+                raise ValueError("Not a valid cryptory method: {}".format(method))
+    
+    def _run_spec(self, spec):
+        # (windows share the limits on each source)
+        cryptory = self if len(spec) == 2 else self._window(*spec[2])
+        return getattr(cryptory, spec[0])(**spec[1])
+    
+    def _batch(self, max_per_source):
+        # the same cryptory, limiting the requests to each source while a batch of specs
+        # runs on it (each batch has its own limits, so batches running at the same
+        # time on this cryptory don't change each other's)
+        output = copy.copy(self)
+        output._max_per_source = max_per_source
+        output._source_limits = {}
+        return output
+    
+    def _window(self, from_date, to_date):
+        # the same cryptory (sharing the session, cache, store etc.) over fewer dates
+        output = copy.copy(self)
+        output.from_date = from_date
+        output.to_date = to_date
+        output._dates = output._grid(from_date, to_date)
+        return output
+    
+    def _grid(self, from_date, to_date):
+        # every period from the start of from_date to the end of to_date
+        return pd.date_range(start=from_date, name='date', freq=self.frequency,
+                             end=pd.Timestamp(_shift_date(to_date, 1)) - pd.Timedelta(seconds=self._seconds))
+    
+    def _chunk_windows(self, chunk):
+        if chunk != 'year' and (not isinstance(chunk, int) or chunk < 1):
+            raise ValueError("chunk must be 'year' or a positive number of days")
+        from_date = datetime.datetime.strptime(self.from_date, "%Y-%m-%d").date()
+        to_date = datetime.datetime.strptime(self.to_date, "%Y-%m-%d").date()
+        windows = []
+        while from_date <= to_date:
+            if chunk == 'year':
+                window_end = min(datetime.date(from_date.year, 12, 31), to_date)
             else:
-                output = output.fillna(method='bfill')
-        output = output[(output['date']>=self.from_date) & (output['date']<=self.to_date)]
+                window_end = min(from_date + datetime.timedelta(days=chunk-1), to_date)
+            windows.append((from_date.strftime("%Y-%m-%d"), window_end.strftime("%Y-%m-%d")))
+            from_date = window_end + datetime.timedelta(days=1)
+        return windows
+    
+    def _fill_across(self, chunks):
+        # each chunk was filled on its own, so gaps at the start of a chunk
+        # are filled from the end of the previous one
+        last_row = None
+        for output in chunks:
+            if self.fillgaps and last_row is not None and len(output) > 0:
+                if not self.ascending:
+                    output = output.iloc[::-1]
+                output = pd.concat([last_row, output], sort=False).ffill().iloc[1:]
+                if not self.ascending:
+                    output = output.iloc[::-1]
+                output = _reset_rows(output)
+            if len(output) > 0:
+                last_row = output.iloc[-1:] if self.ascending else output.iloc[:1]
+            yield output
+    
+    def _extract_stored(self, source, key, fetch, full_page=False, lookback=0):
+        # fetch(from_date, to_date) downloads and parses a date range from the source
+        # full_page sources return their entire history, whatever the date range
+        # lookback is the number of days before from_date also needed by the caller
+        if self.store is None:
+            return fetch(self.from_date, self.to_date)
+        coverage = self.store.coverage(source, key)
+        from_date, to_date = self.from_date, self.to_date
+        if full_page:
+            from_date = _EARLIEST_DATE
+        tail = None
+        new_data = None
+        if coverage is not None:
+            # keep the stored series contiguous
+            from_date, to_date = min(from_date, coverage[0]), max(to_date, coverage[1])
+            windows = []
+            if from_date < coverage[0]:
+                windows.append((from_date, _shift_date(coverage[0], -1)))
+            if to_date > coverage[1]:
+                # the last few stored days are fetched again, as sources can publish
+                # (or revise) recent days late
+                tail = max(coverage[0], _shift_date(coverage[1], 1 - _STORE_OVERLAP))
+                windows.append((tail, to_date))
+        else:
+            windows = [(from_date, to_date)]
+            tail = from_date
+        if len(windows) > 0:
+            if full_page:
+                new_data = fetch(*windows[-1])
+                if coverage is not None:
+                    # only the tail is new (and replaces the stored rows for those days)
+                    new_data = new_data[new_data['date'] >= tail]
+            else:
+                new_data = pd.concat([fetch(window_from, window_to) 
+                                      for window_from, window_to in windows], sort=False)
+            # the series only covers the days the source has actually published
+            # (and not today, as today's values may still change)
+            covered_to = coverage[1] if coverage is not None else None
+            if tail is not None and len(new_data) > 0:
+                covered_to = max(covered_to or _EARLIEST_DATE, min(
+                    to_date, self._last_complete_day(new_data['date']),
+                    _shift_date(datetime.date.today().strftime("%Y-%m-%d"), -1)))
+            if covered_to is not None:
+                with self._phase('store'):
+                    self.store.update(source, key, new_data, (from_date, covered_to))
+        # only the requested dates are loaded from the store
+        with self._phase('store'):
+            output = self.store.read(source, key, _shift_date(self.from_date, -lookback), self.to_date)
+        if output is None:
+            # the source hasn't returned any rows yet (so only the columns are known)
+            if new_data is None:
+                new_data = fetch(self.from_date, self.to_date)
+            output = _reset_rows(new_data.iloc[:0])
+        return output
+    
+    def _last_complete_day(self, dates):
+        # the last day in dates (or the day before, if its last row isn't the end of that day)
+        last = pd.Timestamp(dates.max())
+        day = last.strftime("%Y-%m-%d")
+        if last != last.normalize() and (last + pd.Timedelta(seconds=self._seconds)).normalize() == last.normalize():
+            return _shift_date(day, -1)
+        return day
+    
+    def _is_historical(self, to_date):
+        # data for days that have passed won't change, so it can be cached indefinitely
+        return to_date < datetime.date.today().strftime("%Y-%m-%d")
+    
+    def _fetch_page(self, url, source, headers=None, timeout=None, immutable=False, memo=False,
+                    decode=True):
+        # all web requests go through here, so that responses can be cached
+        # memo keeps the page in memory (for memo_ttl seconds) for other calls
+        # decode=False returns the raw bytes
+        if memo:
+            parsed_page = self._memo.get(url)
+            if parsed_page is not None:
+                self._count('memo_hits')
+                return parsed_page.decode("utf8") if decode else parsed_page
+        parsed_page, shared = self._flights.do(url, lambda: self._fetch_new_page(
+            url, source, headers, timeout, immutable))
+        if shared:
+            self._count('shared_downloads')
+        if memo:
+            self._memo.set(url, parsed_page)
+        return parsed_page.decode("utf8") if decode else parsed_page
+    
+    def _parse(self, parser, parsed_page, *args):
+        # parsers are module level functions, so they can run in another process
+        if self.parse_pool is None:
+            return parser(parsed_page, *args)
+        return self.parse_pool.parse(parser, parsed_page, *args)
+    
+    def _fetch_new_page(self, url, source, headers, timeout, immutable):
+        if self.cache is not None:
+            parsed_page = self.cache.get(source, url, immutable=immutable)
+            if self.metrics is not None:
+                self.metrics.count('cache_misses' if parsed_page is None else 'cache_hits')
+            if parsed_page is not None:
+                return parsed_page
+        if timeout is None:
+            timeout = self.timeout
+        source_limit = self._source_limit(source)
+        if source_limit is not None:
+            source_limit.acquire()
+        try: 
+            with self._phase('download'):
+                parsed_page = self.retry.call(url, lambda: self._download(url, headers, timeout),
+                                              on_retry=self._count_retry)
+        finally:
+            if source_limit is not None:
+                source_limit.release()
+        if self.metrics is not None:
+            self.metrics.count('requests')
+            self.metrics.count('bytes_downloaded', len(parsed_page))
+        if self.cache is not None:
+            self.cache.set(source, url, parsed_page)
+        return parsed_page
+    
+    def _download(self, url, headers, timeout):
+        response = self._session.get(url, headers=headers, timeout=timeout)
+        response.raise_for_status()
+        return response.content
+    
+    def _count_retry(self, error):
+        self._count('retries')
+    
+    def _count(self, name, value=1):
+        if self.metrics is not None:
+            self.metrics.count(name, value)
+    
+    def _phase(self, name):
+        if self.metrics is None:
+            return _NO_PHASE
+        return self.metrics.phase(name)
+    
+    def _carry(self, func):
+        # for functions run by a thread pool, so they're recorded in the current call
+        if self.metrics is None:
+            return func
+        return self.metrics.carry(func)
+    
+    def _source_limit(self, source):
+        # requests are only limited within a batch (see _batch)
+        with self._lock:
+            if self._max_per_source is None:
+                return None
+            if source not in self._source_limits:
+                self._source_limits[source] = threading.BoundedSemaphore(self._max_per_source)
+            return self._source_limits[source]
+
+    def _merge_fill_filter(self, other_df):
+        return self._fill_order(self._reindex([other_df]))
+    
+    @_phased('merge')
+    def _reindex(self, frames):
+        # line up each frame against the daily grid (cheaper than a merge on date)
+        output = []
+        for frame in frames:
+            if 'date' in frame.columns:
+                frame = frame.set_index('date')
+            if not frame.index.is_unique:
+                frame = frame[~frame.index.duplicated(keep='last')]
+            output.append(frame.reindex(self._dates))
+        if len(output) == 1:
+            return output[0]
+        return pd.concat(output, axis=1)
+    
+    @_phased('merge')
+    def _fill_order(self, output):
+        # output is still in ascending order, so gaps are filled from previous days
+        if self.fillgaps:
+            output.ffill(inplace=True)
+        output = output.reset_index()
+        if not self.ascending:
+            output = output.iloc[::-1].reset_index(drop=True)
         return output
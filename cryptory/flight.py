@@ -0,0 +1,87 @@
+import time
+import threading
+from collections import OrderedDict
+
+
+class _SingleFlight():
+    # identical requests made at the same time share a single download
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        # returns func's result and whether it came from another caller's call
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = func()
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+# shared by every cryptory in the process (e.g. one per request in a service),
+# as identical urls return the same page whichever cryptory asks for it
+_FLIGHTS = _SingleFlight()
+
+
+class _Call(object):
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _PageMemo():
+    # recently downloaded pages, kept in memory for ttl seconds
+    # (only the most recently used max_pages are kept)
+
+    def __init__(self, ttl, max_pages=32):
+        self.ttl = ttl
+        self.max_pages = max_pages
+        self._pages = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            self._expire()
+            if key not in self._pages:
+                return None
+            # most recently used last (but still expiring ttl seconds after it was added)
+            entry = self._pages.pop(key)
+            self._pages[key] = entry
+            return entry[1]
+
+    def set(self, key, page):
+        if not self.ttl:
+            return
+        with self._lock:
+            self._pages.pop(key, None)
+            self._pages[key] = (time.time(), page)
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+
+    def items(self):
+        with self._lock:
+            self._expire()
+            return [(key, page) for key, (_, page) in self._pages.items()]
+
+    def _expire(self):
+        now = time.time()
+        for key in [key for key, (added, _) in self._pages.items() if now - added > self.ttl]:
+            del self._pages[key]
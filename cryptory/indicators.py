@@ -0,0 +1,209 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+
+def returns(values, periods=1):
+    """Calculate the percentage change of each value from the one periods rows before
+
+    Parameters
+    ----------
+    values : numpy array (1 or 2 dimensional, one column per series) in date order
+    periods : the number of rows over which each change is calculated (default is 1)
+
+    Returns
+    -------
+    numpy array (the first periods rows are missing)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    output = np.full(values.shape, np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        output[periods:] = values[periods:] / values[:-periods] - 1
+    return output
+
+
+def rolling_mean(values, window):
+    """Calculate the mean of each trailing window of values
+
+    Parameters
+    ----------
+    values : numpy array (1 or 2 dimensional, one column per series) in date order
+    window : the number of rows in each window
+
+    Returns
+    -------
+    numpy array (missing wherever the window has fewer than window finite values)
+    """
+    sums, _, complete, offset = _window_sums(values, window)
+    output = sums / window + offset
+    output[~complete] = np.nan
+    return output
+
+
+def rolling_std(values, window):
+    """Calculate the (sample) standard deviation of each trailing window of values
+
+    Parameters
+    ----------
+    values : numpy array (1 or 2 dimensional, one column per series) in date order
+    window : the number of rows in each window
+
+    Returns
+    -------
+    numpy array (missing wherever the window has fewer than window finite values)
+    """
+    sums, squares, complete, _ = _window_sums(values, window)
+    variance = (squares - sums * sums / window) / (window - 1)
+    # rounding can leave tiny negative variances
+    output = np.sqrt(np.maximum(variance, 0.0))
+    output[~complete] = np.nan
+    return output
+
+
+def correlation(values, columns=None, method='pearson'):
+    """Calculate the correlation matrix of several series
+
+    Parameters
+    ----------
+    values : 2 dimensional numpy array, one column per series
+    columns : the names of the series (default is None i.e. numbered)
+    method : 'pearson', 'kendall' or 'spearman' (default is 'pearson')
+
+    Returns
+    -------
+    pandas Dataframe
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if method == 'pearson' and len(values) > 1 and not np.isnan(values).any():
+        # no gaps, so every pair shares the same dates
+        with np.errstate(invalid='ignore', divide='ignore'):
+            output = np.atleast_2d(np.corrcoef(values, rowvar=False))
+        return pd.DataFrame(output, index=columns, columns=columns)
+    return pd.DataFrame(values, columns=columns).corr(method=method)
+
+
+def _window_sums(values, window):
+    # totals over each trailing window, from running (cumulative) totals
+    # values are centred first, so that the running totals stay small
+    values = np.asarray(values, dtype=np.float64)
+    # e.g. infinite returns (after a value of 0) are treated as missing
+    missing = ~np.isfinite(values)
+    counts = (~missing).sum(axis=0)
+    offset = np.where(missing, 0.0, values).sum(axis=0) / np.maximum(counts, 1)
+    centred = np.where(missing, 0.0, values - offset)
+    sums = _window_totals(centred, window)
+    squares = _window_totals(centred * centred, window)
+    complete = _window_totals((~missing).astype(np.float64), window) >= window
+    return sums, squares, complete, offset
+
+
+def _window_totals(values, window):
+    totals = np.cumsum(values, axis=0)
+    totals[window:] = totals[window:] - totals[:-window]
+    return totals
+
+
+class Indicators():
+
+    def __init__(self, windows=(7, 30), store=None):
+        """Initialise a calculator of common indicators for cryptory dataframes
+
+        For every numeric column, the returns (from each row to the next, e.g. daily
+        returns for daily data), the rolling mean (of the values) and the rolling
+        volatility (standard deviation of the returns) over each window.
+
+        Parameters
+        ----------
+        windows : list of the numbers of rows in each rolling window, i.e. days for
+            daily data (default is (7, 30))
+        store : cryptory SeriesStore where calculated indicators are kept, so that only
+            new days need to be calculated next time
+            (default is None i.e. everything is calculated each time)
+        """
+        if len(windows) == 0 or min(windows) < 2:
+            raise ValueError("windows must be numbers of rows greater than 1")
+        self.windows = sorted(windows)
+        self.store = store
+
+    def compute(self, data, key=None):
+        """Calculate the indicators of a cryptory dataframe
+
+        Parameters
+        ----------
+        data : pandas Dataframe (with a date column or index), e.g. the output of extract_poloniex
+        key : the name under which the indicators are stored (e.g. 'poloniex_btc_eth'),
+            which should differ for each frequency of data
+            (default is None i.e. the indicators aren't stored)
+
+        Returns
+        -------
+        pandas Dataframe, in the same date order as data
+
+        Notes
+        -----
+        Stored values for past days are assumed not to change, so only the days after
+        the stored indicators are calculated (along with enough previous days to fill
+        their windows)
+        """
+        date_col = 'date' in data.columns
+        frame = data.set_index('date') if date_col else data
+        descending = len(frame) > 1 and frame.index[0] > frame.index[-1]
+        frame = frame.sort_index()
+        frame = frame[[col for col in frame.columns if pd.api.types.is_numeric_dtype(frame[col].dtype)
+                       and not pd.api.types.is_bool_dtype(frame[col].dtype)]]
+        if key is None or self.store is None or len(frame) == 0:
+            output = self._calculate(frame)
+        else:
+            output = self._compute_stored(frame, self._key(key))
+        if descending:
+            output = output.iloc[::-1]
+        if date_col:
+            output = output.reset_index()
+        return output
+
+    def _compute_stored(self, frame, key):
+        from_date = frame.index[0].strftime("%Y-%m-%d")
+        to_date = frame.index[-1].strftime("%Y-%m-%d")
+        coverage = self.store.coverage('indicators', key)
+        if coverage is None or from_date < coverage[0]:
+            new_rows = self._calculate(frame)
+        else:
+            # only the days after the stored indicators are new
+            start = int(np.searchsorted(frame.index.values, np.datetime64(coverage[1]), side='right'))
+            # returns need a day before each window
+            first = start - self.windows[-1] - 1
+            if first < 0 and start < len(frame) and from_date > coverage[0]:
+                # the days needed to continue the stored windows aren't in data
+                return self._calculate(frame)
+            new_rows = self._calculate(frame.iloc[max(first, 0):]).iloc[start-max(first, 0):]
+            from_date, to_date = coverage[0], max(to_date, coverage[1])
+        if len(new_rows) > 0:
+            # today's values may still change, so don't treat today as complete
+            yesterday = (datetime.date.today() - datetime.timedelta(days=1)).strftime("%Y-%m-%d")
+            self.store.update('indicators', key, new_rows.reset_index(),
+                              (from_date, min(to_date, yesterday)))
+        output = self.store.read('indicators', key, frame.index[0].strftime("%Y-%m-%d"),
+                                 frame.index[-1].strftime("%Y-%m-%d"))
+        return output.set_index('date')
+
+    def _key(self, key):
+        # different windows give different columns
+        return "_".join([key] + [str(window) for window in self.windows])
+
+    def _calculate(self, frame):
+        values = frame.values.astype(np.float64)
+        daily_returns = returns(values)
+        output = {}
+        for i, col in enumerate(frame.columns):
+            output[col + '_return'] = daily_returns[:, i]
+        for window in self.windows:
+            means = rolling_mean(values, window)
+            volatilities = rolling_std(daily_returns, window)
+            for i, col in enumerate(frame.columns):
+                output['{}_mean_{}'.format(col, window)] = means[:, i]
+                output['{}_volatility_{}'.format(col, window)] = volatilities[:, i]
+        columns = [col + '_return' for col in frame.columns] + [
+            '{}_{}_{}'.format(col, stat, window) for window in self.windows
+            for col in frame.columns for stat in ['mean', 'volatility']]
+        return pd.DataFrame(output, index=frame.index, columns=columns)
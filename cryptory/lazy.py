@@ -0,0 +1,226 @@
+import json
+
+from .cryptory import _spec_label, _date_values, _date_mask, _reset_rows, _compact, \
+    _shift_date, _FILLED_METHODS
+
+# days downloaded before a filter for sources with gaps (weekends, holidays), so
+# the first dates are filled from earlier values (as they would be without the filter)
+_FILL_LOOKBACK = 14
+
+
+class LazyFrame():
+
+    def __init__(self, cryptory, plan):
+        """Initialise a query of cryptory data that isn't run until collect is called
+
+        Usually created from a cryptory, e.g.
+        my_cryptory.lazy().extract_bitinfocharts("btc").join(
+            my_cryptory.lazy().get_stock_prices("%5EDJI")).filter("2018-01-01", "2018-03-31")
+
+        Parameters
+        ----------
+        cryptory : the Cryptory instance that runs the query
+        plan : tuple describing the query, one of ('source', method name, dict of arguments),
+            ('join', list of plans), ('filter', plan, from_date, to_date) or
+            ('select', plan, list of columns)
+        """
+        self.cryptory = cryptory
+        self.plan = plan
+
+    def join(self, *others):
+        """Combine this query with other queries, aligned on date (as in extract_batch)
+
+        Parameters
+        ----------
+        others : LazyFrames (of the same cryptory)
+
+        Returns
+        -------
+        LazyFrame
+        """
+        plans = []
+        for query in (self,) + others:
+            # joins of joins are a single join
+            plans.extend(query.plan[1] if query.plan[0] == 'join' else [query.plan])
+        return LazyFrame(self.cryptory, ('join', plans))
+
+    def filter(self, from_date=None, to_date=None):
+        """Restrict the query to a range of dates
+
+        Parameters
+        ----------
+        from_date : the first date (as string) to return (default is None i.e. no limit)
+        to_date : the last date (as string) to return (default is None i.e. no limit)
+
+        Returns
+        -------
+        LazyFrame
+        """
+        return LazyFrame(self.cryptory, ('filter', self.plan, from_date, to_date))
+
+    def select(self, *columns):
+        """Restrict the query to some columns (the date column is always included)
+
+        Parameters
+        ----------
+        columns : the names of the columns (e.g. 'btc_price', 'close')
+
+        Returns
+        -------
+        LazyFrame
+        """
+        return LazyFrame(self.cryptory, ('select', self.plan, [col for col in columns if col != 'date']))
+
+    def explain(self):
+        """Describe how the query will be run
+
+        Returns
+        -------
+        string, with one line for each download (after filters and columns have
+        been pushed down to them and identical downloads have been combined)
+        """
+        fetches = self._fetches(self._leaves())
+        return "\n".join("{}({}) from {} to {}".format(
+            method, ", ".join("{}={!r}".format(key, val) for key, val in sorted(kwargs.items())),
+            window[0], window[1]) for method, kwargs, window in fetches.values())
+
+    def collect(self, max_workers=8, max_per_source=4):
+        """Run the query
+
+        Parameters
+        ----------
+        max_workers : the number of requests that can run at the same time
+            (default is 8)
+        max_per_source : the number of requests that can be sent to the same website
+            at the same time (default is 4)
+
+        Returns
+        -------
+        pandas Dataframe
+
+        Notes
+        -----
+        Date filters are pushed down to each source, so only those dates are downloaded
+        (or loaded from the store), along with a couple of weeks before them for
+        sources whose gaps are filled. Columns that aren't selected are dropped from each
+        source before any join. Identical sources are only downloaded once (over
+        the combined dates of each use)
+        """
+        leaves = self._leaves()
+        fetches = self._fetches(leaves)
+        keys = list(fetches)
+        _, results, _ = self.cryptory._run_specs(
+            [fetches[key] for key in keys], max_workers, max_per_source)
+        results = dict(zip(keys, results))
+        output = self._evaluate(self.plan, iter(leaves), results)[0]
+        if self.cryptory.compact:
+            return _compact(output)
+        return output
+
+    def _leaves(self):
+        # the (plan, window, columns) of every source, with filters and selects pushed down
+        leaves = []
+        def walk(plan, window, columns):
+            if plan[0] == 'source':
+                if window[0] > window[1]:
+                    raise ValueError("The filters exclude every date")
+                leaves.append((plan, window, columns))
+            elif plan[0] == 'join':
+                for child in plan[1]:
+                    walk(child, window, columns)
+            elif plan[0] == 'filter':
+                walk(plan[1], (max(window[0], plan[2] or window[0]),
+                               min(window[1], plan[3] or window[1])), columns)
+            else:
+                walk(plan[1], window, plan[2] if columns is None else
+                     [col for col in columns if col in plan[2]])
+        walk(self.plan, (self.cryptory.from_date, self.cryptory.to_date), None)
+        return leaves
+
+    def _fetches(self, leaves):
+        # one download per distinct source, covering the dates of every use
+        fetches = {}
+        for plan, window, _ in leaves:
+            if plan[1] in _FILLED_METHODS and self.cryptory.fillgaps:
+                # (the extra dates are dropped once the gaps are filled)
+                window = (max(self.cryptory.from_date, _shift_date(window[0], -_FILL_LOOKBACK)),
+                          window[1])
+            key = _source_key(plan)
+            if key in fetches:
+                fetched = fetches[key][2]
+                window = (min(window[0], fetched[0]), max(window[1], fetched[1]))
+            fetches[key] = (plan[1], plan[2], window)
+        return fetches
+
+    def _evaluate(self, plan, leaves, results):
+        # returns the output, along with its column names before any were dropped
+        # (so that joins suffix the same columns whatever is selected)
+        # leaves are consumed in the same order as they were found by _leaves
+        if plan[0] == 'source':
+            _, window, columns = next(leaves)
+            output = results[_source_key(plan)]
+            dates = _date_values(output)
+            output = _reset_rows(output[_date_mask(dates, window[0], window[1])])
+            all_columns = list(output.columns)
+            if columns is not None:
+                # selected columns may carry the suffix added by a join
+                label = _label(plan)
+                output = output[[col for col in output.columns if col == 'date' or col in columns
+                                 or "_".join([col, label]) in columns]]
+            return output, all_columns
+        if plan[0] == 'join':
+            children = [self._evaluate(child, leaves, results) for child in plan[1]]
+            labels = []
+            for i, child in enumerate(plan[1]):
+                label = _label(child)
+                labels.append(label if label is not None and label not in labels else str(i))
+            output = self.cryptory._join(labels, [child[0] for child in children],
+                                         [child[1] for child in children])
+            all_columns = ['date'] + [col if sum(col in columns for _, columns in children) == 1
+                                      else "_".join([col, label])
+                                      for label, (_, columns) in zip(labels, children)
+                                      for col in columns if col != 'date']
+            return output, all_columns
+        output, all_columns = self._evaluate(plan[1], leaves, results)
+        if plan[0] == 'filter':
+            dates = _date_values(output)
+            return _reset_rows(output[_date_mask(dates, plan[2] or self.cryptory.from_date,
+                                                 plan[3] or self.cryptory.to_date)]), all_columns
+        missing = [col for col in plan[2] if col not in output.columns]
+        if len(missing) > 0:
+            raise ValueError("Columns not in the query: {}".format(", ".join(missing)))
+        return output[[col for col in output.columns if col == 'date'] + plan[2]], plan[2]
+
+
+class _LazySources():
+    # every cryptory method that retrieves data, as the source of a LazyFrame
+
+    def __init__(self, cryptory):
+        self._cryptory = cryptory
+
+    def __getattr__(self, name):
+        if not name.startswith(('extract_', 'get_')) or name in [
+                'extract_batch', 'extract_panel', 'get_indicators'] or not hasattr(self._cryptory, name):
+            raise AttributeError(name)
+        def source(*args, **kwargs):
+            # positional arguments are named, so identical calls are recognised
+            method = getattr(type(self._cryptory), name)
+            code = getattr(method, '__wrapped__', method).__code__
+            kwargs.update(zip(code.co_varnames[1:code.co_argcount], args))
+            return LazyFrame(self._cryptory, ('source', name, kwargs))
+        source.__name__ = name
+        source.__doc__ = getattr(self._cryptory, name).__doc__
+        return source
+
+
+def _source_key(plan):
+    return json.dumps([plan[1], plan[2]], sort_keys=True)
+
+
+def _label(plan):
+    # the suffix for columns shared with other sources (None for a join)
+    while plan[0] in ['filter', 'select']:
+        plan = plan[1]
+    if plan[0] == 'source':
+        return _spec_label(plan[1], plan[2])
+    return None
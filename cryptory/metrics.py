@@ -0,0 +1,195 @@
+import time
+import functools
+import threading
+from contextlib import contextmanager
+
+# counted for every cryptory method call
+_COUNTERS = ['calls', 'errors', 'rows', 'bytes_downloaded', 'requests',
+             'cache_hits', 'cache_misses', 'retries', 'memo_hits', 'shared_downloads']
+
+
+class Metrics():
+
+    def __init__(self, callback=None):
+        """Initialise a collector of timings and counts for cryptory method calls
+
+        Time is split into phases: 'download' (waiting on websites), 'parse'
+        (turning pages into dataframes), 'store' (reading/writing the local store),
+        'merge' (aligning and filling dates) and 'process' (everything else).
+
+        Parameters
+        ----------
+        callback : function called with a summary (dict) of each completed method call
+            (default is None i.e. no function is called)
+        """
+        self.callback = callback
+        self._totals = {}
+        self._lock = threading.Lock()
+        # records can be updated from several threads (see carry)
+        self._record_lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def call(self, extractor):
+        """Record a call of a cryptory method (used internally by Cryptory)
+
+        Parameters
+        ----------
+        extractor : the name of the method (e.g. 'extract_poloniex')
+        """
+        record = dict((counter, 0) for counter in _COUNTERS)
+        record['extractor'] = extractor
+        record['calls'] = 1
+        record['seconds'] = {}
+        try:
+            with self._frame(record, 'process'):
+                yield record
+        except:
+            record['errors'] += 1
+            raise
+        finally:
+            self._finish(record)
+
+    def phase(self, name):
+        """Attribute the time spent in a block of code to a phase of the current call
+
+        Parameters
+        ----------
+        name : the name of the phase (e.g. 'download')
+        """
+        stack = self._stack()
+        if len(stack) == 0:
+            # outside of a cryptory method call, so there's nothing to attribute it to
+            return _NO_PHASE
+        return self._frame(stack[-1][0], name)
+
+    def count(self, name, value=1):
+        """Add to a counter of the current call
+
+        Parameters
+        ----------
+        name : the name of the counter (e.g. 'bytes_downloaded')
+        value : the amount to add (default is 1)
+        """
+        stack = self._stack()
+        if len(stack) > 0:
+            record = stack[-1][0]
+            with self._record_lock:
+                record[name] = record.get(name, 0) + value
+
+    def carry(self, func):
+        """Attribute the phases and counts of a function run in other threads to the current call
+
+        Parameters
+        ----------
+        func : the function (e.g. passed to ThreadPool.map)
+
+        Returns
+        -------
+        function, which records into the current call whichever thread runs it
+        (phases run at the same time in several threads are all counted)
+        """
+        stack = self._stack()
+        if len(stack) == 0:
+            return func
+        record = stack[-1][0]
+        @functools.wraps(func)
+        def carried(*args, **kwargs):
+            # a frame without a phase: its own time is already counted by the caller
+            with self._frame(record, None):
+                return func(*args, **kwargs)
+        return carried
+
+    def as_dict(self):
+        """Summarise all recorded calls
+
+        Returns
+        -------
+        dict keyed by method name, with the counters and the seconds spent in each phase
+        """
+        with self._lock:
+            return dict((extractor, dict(totals, seconds=dict(totals['seconds'])))
+                        for extractor, totals in self._totals.items())
+
+    def to_prometheus(self, prefix='cryptory'):
+        """Summarise all recorded calls in the Prometheus text exposition format
+
+        Parameters
+        ----------
+        prefix : the prefix of every metric name (default is 'cryptory')
+
+        Returns
+        -------
+        string
+        """
+        totals = self.as_dict()
+        lines = []
+        for counter in sorted(set(name for extractor in totals.values() for name in extractor
+                                  if name not in ['extractor', 'seconds'])):
+            lines.append('# TYPE {}_{}_total counter'.format(prefix, counter))
+            for extractor in sorted(totals):
+                lines.append('{}_{}_total{{extractor="{}"}} {}'.format(
+                    prefix, counter, extractor, totals[extractor].get(counter, 0)))
+        lines.append('# TYPE {}_seconds_total counter'.format(prefix))
+        for extractor in sorted(totals):
+            for phase, seconds in sorted(totals[extractor]['seconds'].items()):
+                lines.append('{}_seconds_total{{extractor="{}",phase="{}"}} {:.6f}'.format(
+                    prefix, extractor, phase, seconds))
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Discard all recorded calls"""
+        with self._lock:
+            self._totals = {}
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def _frame(self, record, phase):
+        # frames hold [record, phase, time spent in nested frames]
+        stack = self._stack()
+        frame = [record, phase, 0.0]
+        stack.append(frame)
+        start = time.time()
+        try:
+            yield
+        finally:
+            elapsed = time.time() - start
+            stack.pop()
+            if len(stack) > 0:
+                stack[-1][2] += elapsed
+            if phase is not None:
+                with self._record_lock:
+                    # each phase only counts its own time, not that of nested phases
+                    record['seconds'][phase] = record['seconds'].get(phase, 0.0) + elapsed - frame[2]
+                    if stack == [] or stack[-1][0] is not record:
+                        record['seconds']['total'] = record['seconds'].get('total', 0.0) + elapsed
+
+    def _finish(self, record):
+        with self._lock:
+            totals = self._totals.setdefault(record['extractor'],
+                                             dict([(counter, 0) for counter in _COUNTERS] +
+                                                  [('seconds', {})]))
+            for name, value in record.items():
+                if name == 'seconds':
+                    for phase, seconds in value.items():
+                        totals['seconds'][phase] = totals['seconds'].get(phase, 0.0) + seconds
+                elif name != 'extractor':
+                    totals[name] = totals.get(name, 0) + value
+        if self.callback is not None:
+            self.callback(record)
+
+
+class _NoPhase(object):
+    # stands in for a phase when metrics are disabled (or there's no current call)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+_NO_PHASE = _NoPhase()
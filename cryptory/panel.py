@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+
+from .indicators import returns, correlation
+
+
+class Panel():
+
+    def __init__(self, dates, records, ascending=False, fillgaps=True):
+        """Initialise a panel of many assets and metrics, aligned on date
+
+        Usually created by Cryptory.extract_panel, rather than directly.
+        The records are held as contiguous (long-format) arrays and pivoted
+        onto the dates just once.
+
+        Parameters
+        ----------
+        dates : pandas DatetimeIndex of the dates covered by the panel (in ascending order)
+        records : list of (asset, dataframe) pairs, where each dataframe has a date
+            column (or index) and numeric columns (the metrics of that asset)
+        ascending : whether to return rows in ascending date order
+            (default is False i.e. most recent first)
+        fillgaps : whether to fill missing values with the previous value
+            (default is True)
+        """
+        self.dates = dates
+        self.ascending = ascending
+        self.series = []
+        positions, codes, values = [], [], []
+        for asset, frame in records:
+            frame_dates = frame['date'] if 'date' in frame.columns else frame.index
+            # position of each row within the panel dates
+            position = dates.get_indexer(pd.DatetimeIndex(frame_dates))
+            for col in frame.columns:
+                if col == 'date' or not pd.api.types.is_numeric_dtype(frame[col].dtype) \
+                        or pd.api.types.is_bool_dtype(frame[col].dtype):
+                    continue
+                # e.g. 'btc_price' for asset 'btc' is the 'price' metric
+                metric = col[len(asset)+1:] if col.startswith(asset + "_") else col
+                positions.append(position)
+                codes.append(np.full(len(position), len(self.series), dtype=np.int32))
+                values.append(frame[col].to_numpy(dtype=np.float64, na_value=np.nan))
+                self.series.append((asset, metric))
+        if len(self.series) == 0:
+            raise ValueError("No numeric columns to build a panel from")
+        positions = np.concatenate(positions)
+        codes = np.concatenate(codes)
+        values = np.concatenate(values)
+        # only keep records with a value within the panel dates
+        keep = (positions >= 0) & ~np.isnan(values)
+        self._positions, self._codes, self._values = positions[keep], codes[keep], values[keep]
+        # the single pivot: every record is written straight to its cell
+        grid = np.full((len(dates), len(self.series)), np.nan)
+        grid[self._positions, self._codes] = self._values
+        if fillgaps:
+            grid = pd.DataFrame(grid).ffill().to_numpy()
+        self._grid = grid
+        self._returns = {}
+
+    def long(self):
+        """Retrieve the panel as one row per date, asset and metric
+
+        Returns
+        -------
+        pandas Dataframe with columns date, asset, metric and value
+        """
+        assets = pd.Categorical([asset for asset, _ in self.series])
+        metrics = pd.Categorical([metric for _, metric in self.series])
+        order = np.lexsort((self._codes, self._positions))
+        if not self.ascending:
+            order = order[::-1]
+        codes = self._codes[order]
+        return pd.DataFrame({'date': self.dates[self._positions[order]],
+                             'asset': pd.Categorical.from_codes(assets.codes[codes], assets.categories),
+                             'metric': pd.Categorical.from_codes(metrics.codes[codes], metrics.categories),
+                             'value': self._values[order]},
+                            columns=['date', 'asset', 'metric', 'value'])
+
+    def wide(self, metric=None):
+        """Retrieve the panel as one row per date and one column per asset and metric
+
+        Parameters
+        ----------
+        metric : only include this metric (e.g. 'close'), with one column per asset
+            (default is None i.e. every metric, with columns named asset_metric)
+
+        Returns
+        -------
+        pandas Dataframe
+        """
+        return self._frame(self._grid, metric)
+
+    def returns(self, metric=None, periods=1):
+        """Retrieve the percentage change of every series in the panel
+
+        Parameters
+        ----------
+        metric : only include this metric (e.g. 'close'), with one column per asset
+            (default is None i.e. every metric, with columns named asset_metric)
+        periods : the number of days over which each change is calculated
+            (default is 1)
+
+        Returns
+        -------
+        pandas Dataframe
+        """
+        return self._frame(self._period_returns(periods), metric)
+
+    def correlation(self, metric=None, periods=1, method='pearson'):
+        """Retrieve the correlation matrix of the returns of every series in the panel
+
+        Parameters
+        ----------
+        metric : only include this metric (e.g. 'close'), with one column per asset
+            (default is None i.e. every metric, with columns named asset_metric)
+        periods : the number of days over which each return is calculated
+            (default is 1)
+        method : 'pearson', 'kendall' or 'spearman' (default is 'pearson')
+
+        Returns
+        -------
+        pandas Dataframe
+        """
+        values, columns = self._select(self._period_returns(periods), metric)
+        return correlation(values[periods:], columns, method)
+
+    def _period_returns(self, periods):
+        # computed once for the whole panel, then reused by every view
+        if periods not in self._returns:
+            self._returns[periods] = returns(self._grid, periods)
+        return self._returns[periods]
+
+    def _select(self, values, metric):
+        if metric is None:
+            return values, ["_".join(series) for series in self.series]
+        indices = [i for i, series in enumerate(self.series) if series[1] == metric]
+        if len(indices) == 0:
+            raise ValueError("Not a metric in this panel: {}".format(metric))
+        return values[:, indices], [self.series[i][0] for i in indices]
+
+    def _frame(self, values, metric):
+        values, columns = self._select(values, metric)
+        output = pd.DataFrame(values, columns=columns)
+        output.insert(0, 'date', self.dates)
+        if not self.ascending:
+            output = output.iloc[::-1].reset_index(drop=True)
+        return output
@@ -0,0 +1,173 @@
+import time
+import random
+import threading
+
+import requests
+try:
+    from urllib.parse import urlparse
+# python 2
+except ImportError:
+    from urlparse import urlparse
+
+
+class CircuitOpenError(IOError):
+    """Raised (without sending a request) while a website is failing repeatedly"""
+
+
+class RetryPolicy():
+
+    def __init__(self, retries=3, backoff=0.5, max_backoff=30.0, rate_limits=None,
+                 failure_threshold=5, reset_after=60.0):
+        """Initialise the rules for retrying and pacing the requests sent to each website
+
+        Failed requests are retried after an exponentially increasing (randomised) wait.
+        Only transient failures are retried: connection errors, timeouts and responses
+        with status 429 (too many requests) or 5xx (server errors).
+
+        Parameters
+        ----------
+        retries : the maximum number of times a failed request is retried
+            (default is 3, 0 means requests are never retried)
+        backoff : the wait (in seconds) before the first retry, which doubles for each
+            further retry; the actual wait is a random fraction of it (default is 0.5)
+        max_backoff : the longest wait (in seconds) before a retry (default is 30)
+        rate_limits : the maximum number of requests per second sent to each website,
+            a dict keyed by host (e.g. {'poloniex.com': 6, 'default': 10})
+            (default is None i.e. requests aren't limited)
+        failure_threshold : the number of consecutive failed calls (each counted once,
+            however many times it was retried) after which requests to a website fail immediately (with CircuitOpenError) rather than being sent
+            (default is 5, None means requests are always sent)
+        reset_after : the number of seconds before a request is sent again to a website
+            that reached failure_threshold (default is 60)
+        """
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.rate_limits = rate_limits or {}
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self._buckets = {}
+        self._failures = {}
+        self._opened = {}
+        self._lock = threading.Lock()
+
+    def call(self, url, request, on_retry=None):
+        """Send a request, retrying transient failures
+
+        Parameters
+        ----------
+        url : the url of the request (its host determines the rate limit and circuit)
+        request : function (taking no arguments) that sends the request
+        on_retry : function called with the exception before each retry
+            (default is None i.e. no function is called)
+
+        Returns
+        -------
+        whatever request returns
+
+        Notes
+        -----
+        If the circuit opens while a call is being retried (e.g. after failures of
+        parallel calls), the CircuitOpenError names the call's last error (which
+        is also its __cause__)
+        """
+        host = _host(url)
+        attempt = 0
+        last_error = None
+        while True:
+            self._check_circuit(host, last_error)
+            self._bucket(host).acquire()
+            try:
+                output = request()
+            except Exception as error:
+                retryable = self._retryable(error)
+                if not retryable or attempt >= self.retries:
+                    if retryable:
+                        # one failure per call, not per attempt
+                        self._record(host, False)
+                    raise
+                last_error = error
+                if on_retry is not None:
+                    on_retry(error)
+                time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+                attempt += 1
+                continue
+            self._record(host, True)
+            return output
+
+    def _retryable(self, error):
+        # requests, pytrends (error.response) and aiohttp (error.status) all report the status
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+        if status is None:
+            status = getattr(error, 'status', None)
+        if isinstance(status, int):
+            return status == 429 or status >= 500
+        # connection errors and timeouts (but not e.g. invalid urls)
+        return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+    def _bucket(self, host):
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = _TokenBucket(self.rate_limits.get(
+                    host, self.rate_limits.get('default')))
+            return self._buckets[host]
+
+    def _check_circuit(self, host, last_error=None):
+        with self._lock:
+            opened = self._opened.get(host)
+            if opened is None:
+                return
+            if time.time() - opened < self.reset_after:
+                message = "Too many failed requests to {}, not retrying for {} seconds".format(
+                    host, self.reset_after)
+                if last_error is None:
+                    raise CircuitOpenError(message)
+                error = CircuitOpenError("{} (after {}: {})".format(
+                    message, type(last_error).__name__, last_error))
+                # i.e. raise ... from last_error (on python 3)
+                error.__cause__ = last_error
+                raise error
+            # let one request through, which either closes the circuit or opens it again
+            self._opened[host] = time.time()
+
+    def _record(self, host, success):
+        with self._lock:
+            if success:
+                self._failures.pop(host, None)
+                self._opened.pop(host, None)
+                return
+            self._failures[host] = self._failures.get(host, 0) + 1
+            if self.failure_threshold is not None and self._failures[host] >= self.failure_threshold:
+                self._opened[host] = time.time()
+
+
+class _TokenBucket():
+    # allows bursts of up to capacity requests, refilled at rate requests per second
+    # (rate of None means no limit)
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last = time.time()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate is None:
+            return
+        while True:
+            with self._lock:
+                now = time.time()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def _host(url):
+    # e.g. 'poloniex.com' for 'https://poloniex.com/public?...' (and 'www.' is dropped)
+    host = urlparse(url).netloc or url
+    return host[4:] if host.startswith('www.') else host
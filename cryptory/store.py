@@ -0,0 +1,216 @@
+import os
+import re
+import json
+import tempfile
+import threading
+
+import pandas as pd
+
+
+class SeriesStore():
+
+    def __init__(self, store_dir, file_format=None):
+        """Initialise a local store for previously retrieved time series
+
+        Each series is saved as one columnar file per year, so that a date range
+        can be loaded without reading (or parsing) the rest of the series.
+
+        Parameters
+        ----------
+        store_dir : the directory (as string) where the series are saved
+            (it will be created if it doesn't already exist)
+        file_format : how each file is saved: 'feather' or 'parquet' (both memory-mapped
+            when read and both require pyarrow) or 'pickle'
+            (default is None i.e. 'feather' if pyarrow is installed, otherwise 'pickle')
+        """
+        if file_format is None:
+            try:
+                import pyarrow
+                file_format = 'feather'
+            except ImportError:
+                file_format = 'pickle'
+        if file_format not in ['feather', 'parquet', 'pickle']:
+            raise ValueError("file_format must be one of 'feather', 'parquet', 'pickle'")
+        self.store_dir = os.path.expanduser(store_dir)
+        self.file_format = file_format
+        _makedirs(self.store_dir)
+        # one lock per series, as each update rewrites its files
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def coverage(self, source, key):
+        """Retrieve the date range covered by a stored series
+
+        Parameters
+        ----------
+        source : the name of the data source (e.g. 'poloniex')
+        key : the name of the series within that source (e.g. 'BTC_ETH')
+
+        Returns
+        -------
+        tuple of (from_date, to_date) strings (or None if the series hasn't been stored)
+        """
+        path = os.path.join(self._dir(source, key), 'coverage.json')
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return tuple(json.load(f))
+
+    def read(self, source, key, from_date=None, to_date=None, columns=None):
+        """Retrieve (part of) a stored series
+
+        Parameters
+        ----------
+        source : the name of the data source (e.g. 'poloniex')
+        key : the name of the series within that source (e.g. 'BTC_ETH')
+        from_date : the first date (as string) to return
+            (default is None i.e. from the start of the series)
+        to_date : the last date (as string) to return
+            (default is None i.e. up to the end of the series)
+        columns : list of columns to return, in addition to date
+            (default is None i.e. all columns)
+
+        Returns
+        -------
+        pandas Dataframe (or None if the series hasn't been stored)
+        """
+        directory = self._dir(source, key)
+        years = self._years(directory)
+        if len(years) == 0:
+            return None
+        if columns is not None:
+            columns = ['date'] + [col for col in columns if col != 'date']
+        # only open the files that overlap the requested dates
+        selected_years = [year for year in years 
+                          if (from_date is None or year >= int(from_date[:4])) and
+                          (to_date is None or year <= int(to_date[:4]))]
+        if len(selected_years) == 0:
+            # nothing stored for those dates, but keep the columns
+            return self._read_file(self._path(directory, years[0]), None, None, columns).iloc[:0]
+        output = pd.concat([self._read_file(self._path(directory, year), from_date, to_date, columns)
+                            for year in selected_years], sort=False)
+        if from_date is not None:
+            output = output[output['date'] >= from_date]
+        if to_date is not None:
+            # (to the end of to_date, for series with times)
+            output = output[output['date'] < pd.Timestamp(to_date) + pd.Timedelta(days=1)]
+        return output.reset_index(drop=True)
+
+    def update(self, source, key, data, coverage):
+        """Add new rows to a stored series (rows for existing dates are replaced)
+
+        Only the years present in the new data are rewritten. Updates to the same
+        series (e.g. from extract_batch) are run one at a time.
+
+        Parameters
+        ----------
+        source : the name of the data source (e.g. 'poloniex')
+        key : the name of the series within that source (e.g. 'BTC_ETH')
+        data : pandas Dataframe (with a date column)
+        coverage : the (from_date, to_date) range (as strings) now fully covered by the series
+        """
+        directory = self._dir(source, key)
+        with self._lock(directory):
+            _makedirs(directory)
+            for year, new_rows in data.groupby(data['date'].dt.year):
+                path = self._path(directory, year)
+                if os.path.exists(path):
+                    new_rows = pd.concat([self._read_file(path, None, None, None), new_rows], sort=False)
+                    new_rows = new_rows.drop_duplicates(subset='date', keep='last')
+                new_rows = new_rows.sort_values(by='date').reset_index(drop=True)
+                self._write_file(new_rows, path)
+            # the coverage is only updated once the data is in place
+            tmp_path = _temp_path(directory)
+            try:
+                with open(tmp_path, 'w') as f:
+                    json.dump(list(coverage), f)
+                _replace(tmp_path, os.path.join(directory, 'coverage.json'))
+            except Exception:
+                _discard(tmp_path)
+                raise
+
+    def _lock(self, directory):
+        with self._locks_lock:
+            if directory not in self._locks:
+                self._locks[directory] = threading.Lock()
+            return self._locks[directory]
+
+    def _dir(self, source, key):
+        return os.path.join(self.store_dir, source, re.sub(r"[^A-Za-z0-9_.-]", "_", key))
+
+    def _path(self, directory, year):
+        return os.path.join(directory, '{}.{}'.format(year, self.file_format))
+
+    def _years(self, directory):
+        if not os.path.isdir(directory):
+            return []
+        extension = '.' + self.file_format
+        return sorted([int(name[:-len(extension)]) for name in os.listdir(directory)
+                       if name.endswith(extension) and name[:-len(extension)].isdigit()])
+
+    def _read_file(self, path, from_date, to_date, columns):
+        if self.file_format == 'feather':
+            from pyarrow import feather
+            table = feather.read_table(path, columns=columns, memory_map=True)
+            return table.to_pandas()
+        elif self.file_format == 'parquet':
+            from pyarrow import parquet
+            filters = []
+            if from_date is not None:
+                filters.append(('date', '>=', pd.Timestamp(from_date)))
+            if to_date is not None:
+                filters.append(('date', '<', pd.Timestamp(to_date) + pd.Timedelta(days=1)))
+            table = parquet.read_table(path, columns=columns, memory_map=True,
+                                       filters=filters if len(filters) > 0 else None)
+            return table.to_pandas()
+        output = pd.read_pickle(path)
+        if columns is not None:
+            output = output[columns]
+        return output
+
+    def _write_file(self, data, path):
+        # write then rename, so an interrupted write doesn't corrupt the series
+        tmp_path = _temp_path(os.path.dirname(path))
+        try:
+            if self.file_format == 'feather':
+                from pyarrow import feather
+                feather.write_feather(data, tmp_path)
+            elif self.file_format == 'parquet':
+                data.to_parquet(tmp_path, index=False)
+            else:
+                data.to_pickle(tmp_path)
+            _replace(tmp_path, path)
+        except Exception:
+            _discard(tmp_path)
+            raise
+
+
+def _makedirs(directory):
+    # another thread (or process) may create the directory at the same time
+    try:
+        os.makedirs(directory)
+    except OSError:
+        if not os.path.isdir(directory):
+            raise
+
+
+def _temp_path(directory):
+    # a new file in the same directory (so it can be renamed), unique to each writer
+    handle, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=directory)
+    os.close(handle)
+    return tmp_path
+
+
+def _discard(tmp_path):
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+
+def _replace(tmp_path, path):
+    if hasattr(os, 'replace'):
+        os.replace(tmp_path, path)
+        return
+    # python 2: os.rename won't overwrite an existing file on windows
+    if os.path.exists(path):
+        os.remove(path)
+    os.rename(tmp_path, path)
@@ -0,0 +1,191 @@
+import threading
+import multiprocessing
+
+import numpy as np
+try:
+    from multiprocessing import shared_memory, resource_tracker
+# python 2 (and before 3.8), where results are pickled instead
+except ImportError:
+    shared_memory = None
+
+
+class ParsePool():
+
+    def __init__(self, processes=None, min_size=262144):
+        """Initialise a pool of processes that parse downloaded pages
+
+        Parsing (e.g. the oil and metal tables, or years of poloniex candles) is limited
+        to one core by the GIL, whatever the number of threads. With a ParsePool, each
+        page is parsed in a separate process, so many series (e.g. from extract_batch)
+        can be parsed on every core.
+
+        Parameters
+        ----------
+        processes : the number of processes (default is None i.e. one per core)
+        min_size : the size (in bytes) below which pages are parsed in the calling
+            process, as sending them to the pool would take longer (default is 262144)
+
+        Notes
+        -----
+        The processes are started by the first page large enough to need them, and
+        run until close is called (e.g. at the end of a with block). They're started
+        with forkserver (or spawn) rather than forked from this process, which may be
+        running other threads, so scripts using a ParsePool need the usual
+        if __name__ == '__main__': guard. Pages are sent to the processes (and the parsed arrays sent back) through
+        shared memory, rather than being pickled, where the python version allows it
+        """
+        self.processes = processes
+        self.min_size = min_size
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def parse(self, func, page, *args):
+        """Run a parser on a page
+
+        Parameters
+        ----------
+        func : the parser, a module level function taking the page (and args)
+            and returning numpy arrays (on their own or in tuples, lists or dicts)
+        page : the page, as bytes or string
+        args : any further arguments of func
+
+        Returns
+        -------
+        whatever func returns
+        """
+        if len(page) < self.min_size:
+            return func(page, *args)
+        pool = self._start()
+        if shared_memory is None:
+            return pool.apply(func, (page,) + args)
+        decode = not isinstance(page, bytes)
+        if decode:
+            page = page.encode("utf8")
+        block = shared_memory.SharedMemory(create=True, size=max(len(page), 1))
+        try:
+            block.buf[:len(page)] = page
+            result, name = pool.apply(_parse_shared, (func, block.name, len(page), decode, args))
+        finally:
+            block.close()
+            block.unlink()
+        return _receive(result, name)
+
+    def close(self):
+        """Stop the processes (they're started again if another page is parsed)"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool.join()
+                self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _start(self):
+        with self._lock:
+            if self._pool is None:
+                if shared_memory is not None:
+                    # the processes share this process's tracker of shared memory (rather
+                    # than each starting their own, which would free blocks it doesn't own)
+                    resource_tracker.ensure_running()
+                self._pool = _context().Pool(self.processes)
+            return self._pool
+
+
+def _context():
+    # forking while other threads hold locks (e.g. in extract_batch) can deadlock the processes
+    if not hasattr(multiprocessing, 'get_context'):
+        # python 2
+        return multiprocessing
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context('spawn')
+
+
+def _parse_shared(func, name, size, decode, args):
+    # runs in the pool: reads the page from shared memory and puts the parsed arrays
+    # in a new block of shared memory, which the caller copies and then frees
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        page = bytes(block.buf[:size])
+    finally:
+        block.close()
+    if decode:
+        page = page.decode("utf8")
+    arrays = []
+    result = _extract_arrays(func(page, *args), arrays)
+    size = sum(array.nbytes for array in arrays)
+    if size == 0:
+        return _restore(result, arrays), None
+    block = shared_memory.SharedMemory(create=True, size=size)
+    try:
+        offset = 0
+        for array in arrays:
+            np.ndarray(array.shape, array.dtype, buffer=block.buf, offset=offset)[...] = array
+            offset += array.nbytes
+    finally:
+        block.close()
+    return result, block.name
+
+
+def _receive(result, name):
+    if name is None:
+        return result
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        offset = 0
+        arrays = []
+        for dtype, shape in _array_specs(result):
+            array = np.ndarray(shape, dtype, buffer=block.buf, offset=offset).copy()
+            offset += array.nbytes
+            arrays.append(array)
+    finally:
+        block.close()
+        block.unlink()
+    return _restore(result, arrays)
+
+
+class _SharedArray(tuple):
+    # where an array was in a parser's result: (index, dtype, shape)
+    pass
+
+
+def _extract_arrays(result, arrays):
+    # replaces the numpy arrays in result (other than python objects, which are pickled)
+    if isinstance(result, np.ndarray) and result.dtype != np.dtype('O'):
+        arrays.append(np.ascontiguousarray(result))
+        return _SharedArray((len(arrays) - 1, result.dtype.str, result.shape))
+    if isinstance(result, dict):
+        return type(result)((key, _extract_arrays(value, arrays)) for key, value in result.items())
+    if isinstance(result, (tuple, list)):
+        return type(result)(_extract_arrays(value, arrays) for value in result)
+    return result
+
+
+def _array_specs(result):
+    # the dtype and shape of each array, in the order they were extracted
+    specs = {}
+    def walk(value):
+        if isinstance(value, _SharedArray):
+            specs[value[0]] = (np.dtype(value[1]), value[2])
+        elif isinstance(value, dict):
+            for item in value.values():
+                walk(item)
+        elif isinstance(value, (tuple, list)):
+            for item in value:
+                walk(item)
+    walk(result)
+    return [specs[i] for i in range(len(specs))]
+
+
+def _restore(result, arrays):
+    if isinstance(result, _SharedArray):
+        return arrays[result[0]]
+    if isinstance(result, dict):
+        return type(result)((key, _restore(value, arrays)) for key, value in result.items())
+    if isinstance(result, (tuple, list)):
+        return type(result)(_restore(value, arrays) for value in result)
+    return result
@@ -34,18 +34,17 @@ import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 
-all_coins_df = my_cryptory.extract_bitinfocharts("btc")
 # coins of interest
 bitinfocoins = ["btc", "eth", "xrp", "bch", "ltc", "dash", "xmr", "doge"]
-for coin in bitinfocoins[1:]:
-    all_coins_df = all_coins_df.merge(my_cryptory.extract_bitinfocharts(coin), on="date", how="left")
-# date column not need for upcoming calculations
-all_coins_df = all_coins_df.drop('date', axis=1)
-corr = all_coins_df.pct_change().corr(method='pearson')
+# pull all coins at the same time, into a single panel
+all_coins = my_cryptory.extract_panel([("extract_bitinfocharts", {"coin": coin})
+                                       for coin in bitinfocoins])
+# correlation of daily returns (one column per coin)
+corr = all_coins.correlation("price", method='pearson')
 fig, ax = plt.subplots(figsize=(7,5))  
 sns.heatmap(corr, 
-            xticklabels=[col.replace("_price", "") for col in corr.columns.values],
-            yticklabels=[col.replace("_price", "") for col in corr.columns.values],
+            xticklabels=corr.columns.values,
+            yticklabels=corr.columns.values,
             annot_kws={"size": 16})
 plt.show()
 
@@ -28,4 +28,9 @@ setup(name='cryptory',
         'pandas>=0.23.0',
         'numpy>=1.14.0',
         'pytrends>=4.4.0',
-        'beautifulsoup4>=4.0.0'])
+        'requests>=2.0.0'],
+      extras_require={
+        'store': ['pyarrow>=0.17.0'],
+        'async': ['aiohttp>=3.0.0']},
+      entry_points={
+        'console_scripts': ['cryptory = cryptory.cli:main']})
@@ -0,0 +1,53 @@
+import re
+import time
+import threading
+
+from cryptory import Cryptory
+
+
+class _Response(object):
+
+    def __init__(self, content):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+
+class _SlowSession(object):
+    # serves empty pages slowly, keeping track of the most requests at the same time
+    # for each batch (named by the first letter of the second coin)
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.running = {}
+        self.most_running = {}
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, timeout=None):
+        batch = re.search(r"currencyPair=BTC_(\w)", url).group(1)
+        with self._lock:
+            self.running[batch] = self.running.get(batch, 0) + 1
+            self.most_running[batch] = max(self.most_running.get(batch, 0), self.running[batch])
+        time.sleep(self.seconds)
+        with self._lock:
+            self.running[batch] -= 1
+        return _Response(b'[]')
+
+
+def test_concurrent_batches_keep_their_limits():
+    cr = Cryptory('2019-01-01', '2019-01-31', memo_ttl=0)
+    cr._session = _SlowSession(0.05)
+    def batch(name, n_specs):
+        cr.extract_batch([('extract_poloniex', {'coin1': 'btc', 'coin2': '{}{}'.format(name, i)})
+                          for i in range(n_specs)], max_workers=2, max_per_source=1)
+    # the short batch starts (and finishes) while the long one is running
+    threads = [threading.Thread(target=batch, args=args) for args in [('l', 8), ('s', 2)]]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.02)
+    for thread in threads:
+        thread.join()
+    assert cr._session.most_running == {'L': 1, 'S': 1}
+    # and the cryptory itself isn't limited
+    assert cr._source_limit('poloniex') is None
@@ -0,0 +1,18 @@
+import os
+import sys
+
+import numpy as np
+
+from cryptory import Cryptory
+
+# the offline pages of the benchmarks
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+from fixtures import FixtureSession
+
+
+def test_compact_indicators():
+    cr = Cryptory('2019-01-01', '2019-03-10', compact=True)
+    cr._session = FixtureSession('2018-12-01', '2019-03-31')
+    output = cr.get_indicators('extract_poloniex', coin1='btc', coin2='eth')
+    assert output.index.name == 'date'
+    assert (output.dtypes == np.float32).all()
@@ -0,0 +1,40 @@
+import time
+import threading
+
+from cryptory import Cryptory
+
+
+class _Response(object):
+
+    def __init__(self, content):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+
+class _SlowSession(object):
+    # serves empty pages slowly, counting the requests
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.requests = 0
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests += 1
+        time.sleep(self.seconds)
+        return _Response(b'[]')
+
+
+def test_instances_share_downloads():
+    # e.g. one cryptory per request in a service
+    cryptories = [Cryptory('2019-01-01', '2019-01-31', memo_ttl=0) for _ in range(4)]
+    for cr in cryptories:
+        cr._session = _SlowSession(0.2)
+    threads = [threading.Thread(target=cr.extract_poloniex, args=('btc', 'flight'))
+               for cr in cryptories]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(cr._session.requests for cr in cryptories) == 1
@@ -0,0 +1,35 @@
+import os
+import sys
+
+from cryptory import Cryptory
+from cryptory.store import SeriesStore
+
+# the offline pages of the benchmarks
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+from fixtures import FixtureSession
+
+
+def _cryptory(frequency, **kwargs):
+    cr = Cryptory('2019-01-01', '2019-01-10', frequency=frequency, **kwargs)
+    cr._session = FixtureSession('2018-12-01', '2019-01-31')
+    return cr
+
+
+def test_stored_indicators_per_frequency(tmpdir):
+    store = SeriesStore(str(tmpdir))
+    daily = _cryptory('D', store=store).get_indicators('extract_poloniex', coin1='btc', coin2='eth')
+    hourly = _cryptory('h', store=store).get_indicators('extract_poloniex', coin1='btc', coin2='eth')
+    assert len(daily) == 10
+    assert len(hourly) == 240
+    assert hourly['date'].is_unique
+
+
+def test_batch_fills_daily_sources():
+    cr = _cryptory('h')
+    output = cr.extract_batch([('extract_bitinfocharts', {'coin': 'btc'}),
+                               ('extract_poloniex', {'coin1': 'btc', 'coin2': 'eth'})])
+    assert len(output) == 240
+    assert output['btc_price'].notnull().all()
+    # each hour has the price of its day
+    merged = cr.merge_frames([cr.extract_bitinfocharts('btc')])
+    assert (output['btc_price'].values == merged['btc_price'].values).all()
@@ -0,0 +1,132 @@
+import json
+
+import numpy as np
+import pytest
+
+from cryptory.cryptory import _parse_json_columns, _parse_poloniex, _parse_yahoo
+
+
+def _json_columns(page):
+    # what json.loads makes of a page, as one array per field
+    rows = json.loads(page.decode("utf8"))
+    if len(rows) == 0:
+        return {}
+    return dict((key, np.array([row[key] for row in rows])) for key in rows[0])
+
+
+def _check(page):
+    # the columnar parser either falls back (None) or matches json.loads exactly
+    output = _parse_json_columns(page)
+    if output is None:
+        return None
+    expected = _json_columns(page)
+    assert sorted(output) == sorted(expected)
+    for key in expected:
+        assert output[key].dtype == expected[key].dtype
+        np.testing.assert_array_equal(output[key], expected[key])
+    return output
+
+
+def test_empty_list():
+    assert _check(b'[]') == {}
+    assert _check(b' [ ]\n') == {}
+
+
+def test_ints_and_floats():
+    output = _check(b'[{"date":1514764800,"close":0.0321,"volume":12},'
+                    b' {"date":1514851200,"close":0.0334,"volume":7}]')
+    assert output['date'].dtype == np.int64
+    assert output['close'].dtype == np.float64
+
+
+def test_negative_values():
+    output = _check(b'[{"date":1,"change":-0.5,"delta":-3},{"date":2,"change":0.25,"delta":4}]')
+    assert output is not None
+    assert output['change'][0] == -0.5
+
+
+def test_mixed_int_and_float_field():
+    # json.loads gives 1 and 1.5, so the field is float64 (as numpy would make it)
+    output = _check(b'[{"date":1,"close":1},{"date":2,"close":1.5},{"date":3,"close":2}]')
+    assert output is not None
+    assert output['close'].dtype == np.float64
+
+
+@pytest.mark.parametrize('page', [
+    b'[{"date":1,"close":null},{"date":2,"close":0.5}]',
+    b'[{"date":1,"close":1e-05},{"date":2,"close":0.5}]',
+    b'[{"date":1,"close":-1.5E+05},{"date":2,"close":0.5}]',
+    b'[{"date":1,"close":"0.5"},{"date":2,"close":"0.6"}]',
+    b'[{"date":1,"close":true},{"date":2,"close":false}]',
+])
+def test_non_numbers_fall_back(page):
+    assert _parse_json_columns(page) is None
+
+
+@pytest.mark.parametrize('page', [
+    # the same keys in a different order
+    b'[{"date":1,"close":0.5},{"close":0.6,"date":2}]',
+    # a missing key
+    b'[{"date":1,"close":0.5},{"date":2}]',
+    # an extra key
+    b'[{"date":1,"close":0.5},{"date":2,"close":0.6,"open":0.4}]',
+    # keys with digits
+    b'[{"date":1,"ma50":0.5},{"date":2,"ma50":0.6}]',
+    # nested objects
+    b'[{"date":1,"close":{"value":0.5}}]',
+    # not a list of objects
+    b'{"error":"Invalid currency pair."}',
+    b'[1,2,3]',
+])
+def test_mismatched_objects_fall_back(page):
+    assert _parse_json_columns(page) is None
+
+
+def test_poloniex_fallback_matches():
+    # a page that falls back is parsed as before
+    page = (b'[{"date":1,"high":1e-05,"low":0.5,"open":0.5,"close":0.5,"volume":1.5,'
+            b'"quoteVolume":2.5,"weightedAverage":0.5},'
+            b'{"date":2,"high":0.6,"low":0.5,"open":null,"close":0.5,"volume":1.5,'
+            b'"quoteVolume":2.5,"weightedAverage":0.5}]')
+    output = _parse_poloniex(page)
+    np.testing.assert_array_equal(output['date'], [1, 2])
+    np.testing.assert_array_equal(output['high'], [1e-05, 0.6])
+    assert np.isnan(output['open'][1])
+
+
+def test_poloniex_error():
+    with pytest.raises(ValueError):
+        _parse_poloniex(b'{"error":"Invalid currency pair."}')
+
+
+def _yahoo_page(rows):
+    return (b'<html><script>root.App.main = {"HistoricalPriceStore":{"prices":'
+            + json.dumps(rows).encode("utf8") + b',"isPending":false}};</script></html>')
+
+
+_DIVIDEND = {"amount": 0.42, "date": 1514900000, "type": "DIVIDEND", "data": 0.42}
+
+
+@pytest.mark.parametrize('position', [0, 1, 2])
+def test_yahoo_dividends_dropped(position):
+    prices = [{"date": 1514818800 + i * 86400, "open": 100.5 + i, "high": 101.5 + i,
+               "low": 99.5 + i, "close": 100.25 + i, "volume": 300000000 + i,
+               "adjclose": 100.25 + i} for i in range(2)]
+    rows = prices[:position] + [_DIVIDEND] + prices[position:]
+    output = _parse_yahoo(_yahoo_page(rows))
+    expected = _json_columns(json.dumps(prices).encode("utf8"))
+    assert sorted(output) == sorted(expected)
+    for key in expected:
+        np.testing.assert_array_equal(output[key], expected[key])
+    assert output['date'].dtype == np.int64
+
+
+def test_yahoo_null_prices():
+    # (falls back to json, as before)
+    rows = [{"date": 1514818800, "open": None, "high": None, "low": None, "close": None,
+             "volume": None, "adjclose": None},
+            {"date": 1514905200, "open": 100.5, "high": 101.5, "low": 99.5, "close": 100.25,
+             "volume": 300000000, "adjclose": 100.25}, _DIVIDEND]
+    output = _parse_yahoo(_yahoo_page(rows))
+    np.testing.assert_array_equal(output['date'], [1514818800, 1514905200])
+    assert np.isnan(output['close'][0]) and output['close'][1] == 100.25
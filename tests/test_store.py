@@ -0,0 +1,46 @@
+import pandas as pd
+
+from cryptory import Cryptory
+from cryptory.store import SeriesStore
+
+
+class _Response(object):
+
+    def __init__(self, content):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+
+class _Session(object):
+    # serves the same page for every url
+
+    def __init__(self, content):
+        self.content = content
+
+    def get(self, url, headers=None, timeout=None):
+        return _Response(self.content)
+
+
+def _cryptory(content, **kwargs):
+    cr = Cryptory('2019-01-01', '2019-01-31', **kwargs)
+    cr._session = _Session(content)
+    return cr
+
+
+def test_empty_source_without_store():
+    output = _cryptory(b'[]').extract_poloniex('btc', 'eth')
+    assert len(output) == 0
+    assert 'close' in output.columns
+
+
+def test_empty_source_with_store(tmpdir):
+    # a cold store, then a store that has only seen empty pages
+    store = SeriesStore(str(tmpdir))
+    expected = list(_cryptory(b'[]').extract_poloniex('btc', 'eth').columns)
+    for _ in range(2):
+        output = _cryptory(b'[]', store=store).extract_poloniex('btc', 'eth')
+        assert isinstance(output, pd.DataFrame)
+        assert len(output) == 0
+        assert list(output.columns) == expected